@@ -0,0 +1,45 @@
+from time import perf_counter
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.metrics import (
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    http_requests_total,
+)
+
+
+class MetricsMiddleware:
+    """Counts HTTP requests and their latency per method, route template and status.
+
+    Plain ASGI rather than ``BaseHTTPMiddleware`` so streaming responses pass
+    through untouched; latency runs until the last body chunk is sent.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            # Unmatched paths share one label so arbitrary URLs cannot blow up cardinality
+            labels = (scope["method"], getattr(route, "path", "unmatched"), str(status_code))
+            http_requests_total.inc(*labels)
+            http_request_duration_seconds.observe(perf_counter() - start, *labels)
@@ -0,0 +1,170 @@
+import asyncio
+import io
+from typing import Any, List, Literal, Optional
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import require_admin
+from app.db.session import get_db, pool_status
+from app.models.request_profile import RequestProfile
+from app.schemas.admin import RetentionUpdate
+from app.services.evm_inference import FEATURE_NAMES
+from app.services.feature_store import FEATURE_SCHEMA_VERSION, load_feature_matrix
+from app.services.history_retention import history_retention
+from app.services.profiler import call_tree, folded
+from app.services.worker_memory import memory_report
+
+router = APIRouter()
+
+
+@router.get("/admin/history/retention", tags=["admin"])
+async def get_history_retention(
+    _user: dict = Depends(require_admin),
+) -> dict:
+    """Current history retention window, job state and partitions (admin only)."""
+    try:
+        partitions = await history_retention.partitions()
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Database connection error: {exc}",
+        )
+    return {**history_retention.stats(), "partitions": partitions}
+
+
+@router.put("/admin/history/retention", tags=["admin"])
+async def update_history_retention(
+    payload: RetentionUpdate,
+    _user: dict = Depends(require_admin),
+) -> dict:
+    """Change the history retention window and apply it immediately (admin only)."""
+    try:
+        await history_retention.set_retention_days(payload.retention_days)
+        result = await history_retention.run_once()
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Database connection error: {exc}",
+        )
+    return {**history_retention.stats(), **result}
+
+
+def _npz(contract_ids: np.ndarray, features: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.savez(buffer, contract_ids=contract_ids, features=features, feature_names=np.array(FEATURE_NAMES))
+    return buffer.getvalue()
+
+
+@router.get("/admin/features/export", tags=["admin"])
+async def export_features(
+    _user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+    model_version: Optional[str] = None,
+) -> Response:
+    """Stored feature vectors as a NumPy ``.npz`` for retraining (admin only).
+
+    Arrays: ``contract_ids``, ``features`` (float64, one row per contract,
+    columns in ``feature_names`` order) and ``feature_names``. Only vectors of
+    the current feature schema are included; ``model_version`` limits the
+    export to contracts scored by that model.
+    """
+    try:
+        contract_ids, features = await load_feature_matrix(db, model_version)
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Database connection error: {exc}",
+        )
+    return Response(
+        content=await asyncio.to_thread(_npz, contract_ids, features),
+        media_type="application/octet-stream",
+        headers={
+            "Content-Disposition": f'attachment; filename="features_v{FEATURE_SCHEMA_VERSION}.npz"',
+        },
+    )
+
+
+@router.get("/admin/db/pool", tags=["admin"])
+async def get_db_pool(
+    _user: dict = Depends(require_admin),
+) -> dict:
+    """Connection pool settings, live usage and checkout/pre-ping timings (admin only).
+
+    Counts are per process: multiply ``max_connections`` by the number of
+    uvicorn workers to size the pool against the server's connection limit.
+    """
+    return pool_status()
+
+
+@router.get("/admin/memory", tags=["admin"])
+async def get_memory(
+    _user: dict = Depends(require_admin),
+) -> dict:
+    """Per-worker RSS against memory shared with the prefork master (admin only)."""
+    return memory_report()
+
+
+@router.get("/admin/profiles", tags=["admin"])
+async def list_profiles(
+    _user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(50, ge=1, le=500),
+) -> List[dict]:
+    """Most recent request profiles without their stacks (admin only)."""
+    try:
+        result = await db.execute(
+            select(
+                RequestProfile.id,
+                RequestProfile.created_at,
+                RequestProfile.bytecode_hash,
+                RequestProfile.interval_ms,
+                RequestProfile.duration_ms,
+                RequestProfile.sample_count,
+            )
+            .order_by(RequestProfile.created_at.desc())
+            .limit(limit)
+        )
+        return [dict(row) for row in result.mappings()]
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Database connection error: {exc}",
+        )
+
+
+@router.get("/admin/profiles/{profile_id}", tags=["admin"])
+async def get_profile(
+    profile_id: str,
+    _user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+    profile_format: Literal["tree", "folded"] = Query("tree", alias="format"),
+) -> Any:
+    """A stored profile by the ``X-Profile-Id`` of its request (admin only).
+
+    ``format=tree`` returns a d3-flame-graph style call tree, ``format=folded``
+    collapsed stacks for flamegraph.pl or speedscope.
+    """
+    try:
+        profile = await db.get(RequestProfile, profile_id)
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Database connection error: {exc}",
+        )
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="profile not found")
+    if profile_format == "folded":
+        return PlainTextResponse(folded(profile.stacks))
+    return {
+        "id": profile.id,
+        "created_at": profile.created_at,
+        "bytecode_hash": profile.bytecode_hash,
+        "interval_ms": profile.interval_ms,
+        "duration_ms": profile.duration_ms,
+        "sample_count": profile.sample_count,
+        "tree": call_tree(profile.stacks),
+    }
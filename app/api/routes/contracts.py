@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.models.bytecode_blob import BytecodeBlob
+from app.models.contract import Contract
+from app.services.bytecode_store import load_bytecode, to_hex
+
+router = APIRouter()
+
+
+@router.get("/contracts/{contract_id}/bytecode", tags=["contracts"])
+async def get_contract_bytecode(
+    contract_id: int,
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """Return the stored bytecode of a contract as hex."""
+    try:
+        row = (
+            await db.execute(
+                select(Contract.bytecode_hash, BytecodeBlob.data)
+                .join(BytecodeBlob, BytecodeBlob.hash == Contract.bytecode_hash)
+                .where(Contract.id == contract_id)
+            )
+        ).first()
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Database connection error: {exc}",
+        )
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="contract not found")
+    digest, data = row
+    return {"contract_id": contract_id, "bytecode_hash": digest, "bytecode": to_hex(data)}
+
+
+@router.get("/bytecodes/{bytecode_hash}", tags=["contracts"])
+async def get_bytecode(
+    bytecode_hash: str,
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """Return bytecode by its SHA-256 hash as hex."""
+    try:
+        bytecode = await load_bytecode(db, bytecode_hash.lower())
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Database connection error: {exc}",
+        )
+    if bytecode is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="bytecode not found")
+    return {"bytecode_hash": bytecode_hash.lower(), "bytecode": bytecode}
@@ -1,22 +1,114 @@
 import json
+import random
+import uuid
+from datetime import datetime
 from time import perf_counter
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Union
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.core.config import settings
+from app.core.security import decode_token
+from app.db.session import AsyncSessionLocal, get_db
+from app.features.evm_decoder import to_bytes
 from app.models.contract import Contract, ContractMetadata
-from app.models.request_history import RequestHistory
 from app.schemas.forward import ForwardRequest
-from app.services.evm_inference import predict_with_features
+from app.services.evm_inference import MODEL_VERSION
+from app.services.feature_store import FEATURE_SCHEMA_VERSION, unpack_features
+from app.services.inference_executor import InferenceSaturated, inference_executor
+from app.services.metrics import observe_stages
+from app.services.prediction_cache import CachedPrediction, bytecode_hash, prediction_cache
+from app.services.write_behind import write_behind
 
 router = APIRouter()
 
 
+async def _lookup_contracts(db: AsyncSession, digests: Iterable[str]) -> Dict[str, CachedPrediction]:
+    """Find stored predictions for the given bytecode hashes and the current model."""
+    digests = list(digests)
+    if not digests:
+        return {}
+    try:
+        result = await db.execute(
+            select(Contract.bytecode_hash, Contract.prediction, ContractMetadata.feature_vector)
+            .join(ContractMetadata, ContractMetadata.contract_id == Contract.id)
+            .where(
+                Contract.bytecode_hash.in_(digests),
+                Contract.model_version == MODEL_VERSION,
+                ContractMetadata.feature_schema_version == FEATURE_SCHEMA_VERSION,
+            )
+        )
+        rows = result.all()
+    except Exception as exc:
+        print(f"✗ Error looking up cached contracts: {type(exc).__name__}: {exc}")
+        try:
+            await db.rollback()
+        except Exception:
+            pass
+        return {}
+    return {
+        digest: (prediction, unpack_features(feature_vector))
+        for digest, prediction, feature_vector in rows
+    }
+
+
+async def _lookup_contract(db: AsyncSession, digest: str) -> Optional[CachedPrediction]:
+    """Find a stored prediction for the same bytecode and model version."""
+    return (await _lookup_contracts(db, [digest])).get(digest)
+
+
+def _admin_profile_requested(x_profile: Optional[str], authorization: Optional[str]) -> bool:
+    """``X-Profile`` forces profiling, but only with an admin bearer token."""
+    if not x_profile or x_profile.lower() in ("0", "false", "no"):
+        return False
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
+    if not decode_token(token).get("is_admin"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return True
+
+
+def _body_too_large(limit: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail=f"request body is larger than {limit} bytes",
+    )
+
+
+def _check_content_length(request: Request, limit: int) -> None:
+    """Refuse an oversize body from its declared length, before reading any of it."""
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > limit:
+        raise _body_too_large(limit)
+
+
+async def _read_body(request: Request, limit: int) -> bytes:
+    """Request body; chunked uploads are cut off as soon as they pass ``limit`` bytes."""
+    _check_content_length(request, limit)
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise _body_too_large(limit)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _server_timing(stage_timings_ms: Dict[str, float]) -> str:
+    return ", ".join(f"{stage};dur={duration}" for stage, duration in stage_timings_ms.items())
+
+
 @router.post("/forward", tags=["forward"])
 async def forward(
     request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     authorization: Optional[str] = Header(
         None, description="Authorization header"),
@@ -25,12 +117,20 @@ async def forward(
         alias="X-Bytecode",
         description="EVM bytecode as hex string (0x...)",
     ),
+    x_profile: Optional[str] = Header(
+        None,
+        alias="X-Profile",
+        description="Admin only: profile feature extraction for this request",
+    ),
 ) -> Dict[str, Any]:
-    """Forward endpoint that accepts JSON or form data."""
-    stored_headers = dict(request.headers)
+    """Forward endpoint that accepts JSON, form data or raw bytecode (application/octet-stream)."""
+    parse_start = perf_counter()
     content_type = (request.headers.get("content-type") or "").lower()
+    # Hex string from JSON/headers, or the raw bytes of an octet-stream body
+    bytecode: Union[str, bytes, None]
 
     if content_type.startswith("multipart/form-data"):
+        _check_content_length(request, settings.forward_max_body_bytes)
         form = await request.form()
         text = form.get("text")
         if not x_bytecode:
@@ -42,78 +142,123 @@ async def forward(
             bytecode=x_bytecode,
             text=str(text) if text is not None else None,
         )
+        bytecode = data.bytecode
+    elif content_type.startswith("application/octet-stream"):
+        raw_body = await _read_body(request, settings.forward_max_body_bytes)
+        data = ForwardRequest(bytecode=x_bytecode if not raw_body else None)
+        # Raw bytes go to the hash, the extractor and the blob store as they are
+        bytecode = raw_body or data.bytecode
     else:
-        raw_body = await request.body()
-        if raw_body and raw_body.strip():
+        raw_body = await _read_body(request, settings.forward_max_body_bytes)
+        if raw_body.strip():
             try:
-                payload = json.loads(raw_body)
-            except json.JSONDecodeError as exc:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="invalid JSON body",
-                ) from exc
+                # Parsed and validated in one pass by pydantic-core, without an intermediate dict
+                data = ForwardRequest.model_validate_json(raw_body)
+            except ValidationError as exc:
+                if any(error["type"] == "json_invalid" for error in exc.errors()):
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="invalid JSON body",
+                    ) from exc
+                # Same 400 as any other request validation error
+                raise RequestValidationError(exc.errors()) from exc
         else:
-            payload = {}
-        if not payload and x_bytecode:
-            payload = {"bytecode": x_bytecode}
-        data = ForwardRequest.model_validate(payload)
+            data = ForwardRequest()
+        if not data.model_fields_set and x_bytecode:
+            data = ForwardRequest(bytecode=x_bytecode)
+        bytecode = data.bytecode
 
-    if not data.bytecode:
+    if not bytecode:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="bytecode is required",
         )
+    force_profile = _admin_profile_requested(x_profile, authorization)
     start_time = perf_counter()
-    try:
-        prediction, features = predict_with_features(data.bytecode)
+    stages = [("parse_body", start_time - parse_start)]
+    digest = bytecode_hash(bytecode)
+    cache_key = (MODEL_VERSION, digest)
+    cached = prediction_cache.get(cache_key)
+    if cached is None:
+        lookup_start = perf_counter()
+        cached = await _lookup_contract(db, digest)
+        stages.append(("db_lookup", perf_counter() - lookup_start))
+        if cached is not None:
+            prediction_cache.record_db_hit()
+            prediction_cache.put(cache_key, cached)
+
+    profile = None
+    # A forced profile re-runs extraction even for known contracts
+    if cached is not None and not force_profile:
+        prediction, features = cached
         model_success = True
-    except FileNotFoundError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="model file not found",
-        ) from exc
-    except Exception as exc:
-        model_success = False
-        prediction = None
-        features = None
+    else:
+        try:
+            if force_profile or random.random() < settings.profile_sample_rate:
+                prediction, features, profile = await inference_executor.predict_profiled(
+                    bytecode, settings.profile_interval_ms, stages
+                )
+            else:
+                prediction, features = await inference_executor.predict_with_features(bytecode, stages)
+            model_success = True
+            prediction_cache.put(cache_key, (prediction, features))
+        except InferenceSaturated as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="inference queue is full",
+                headers={"Retry-After": "1"},
+            ) from exc
+        except FileNotFoundError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="model file not found",
+            ) from exc
+        except Exception as exc:
+            model_success = False
+            prediction = None
+            features = None
     processing_time_ms = int((perf_counter() - start_time) * 1000)
+    observe_stages(stages)
+    stages.append(("total", perf_counter() - parse_start))
+    stage_timings_ms = {stage: round(seconds * 1000, 3) for stage, seconds in stages}
+    response.headers["Server-Timing"] = _server_timing(stage_timings_ms)
+    if profile is not None:
+        profile_id = uuid.uuid4().hex
+        response.headers["X-Profile-Id"] = profile_id
+        await write_behind.add_profile({"id": profile_id, "bytecode_hash": digest, **profile})
 
     response_status = "success"
     response_data = None
-    bytecode_length = len(data.bytecode) if data.bytecode else None
+    # Length in hex characters ("0x" included) whatever the upload format
+    bytecode_length = len(bytecode) if isinstance(bytecode, str) else 2 + 2 * len(bytecode)
 
     if not model_success:
         response_status = "error"
         response_data = {"error": "модель не смогла обработать данные"}
 
-        try:
-            history_record = RequestHistory(
-                created_at=data.created_at,
-                request_headers=None,
-                response_status=response_status,
-                response_data=response_data,
-                processing_time_ms=processing_time_ms,
-                bytecode_length=bytecode_length,
-            )
-            db.add(history_record)
-            await db.commit()
-            print("✓ Failed request saved to history")
-        except Exception as exc:
-            print(
-                f"✗ Error saving failed request to history: {type(exc).__name__}: {exc}")
-            try:
-                await db.rollback()
-            except Exception:
-                pass
+        await write_behind.add_history({
+            "created_at": data.created_at,
+            "request_headers": None,
+            "response_status": response_status,
+            "response_data": response_data,
+            "processing_time_ms": processing_time_ms,
+            "bytecode_length": bytecode_length,
+            "bytecode_hash": digest,
+            "stage_timings_ms": stage_timings_ms,
+        })
 
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="модель не смогла обработать данные",
+            headers={"Server-Timing": response.headers["Server-Timing"]},
         )
 
+    echoed = data.model_dump(mode="json")
+    if isinstance(bytecode, bytes):
+        echoed["bytecode"] = "0x" + bytecode.hex()
     response_data = {
         "status": "success",
-        "data": data.model_dump(mode="json"),
+        "data": echoed,
         "result": {
             "processed": True,
             "created_at": data.created_at.isoformat(),
@@ -121,41 +266,172 @@ async def forward(
         },
     }
 
-    try:
-        contract = Contract(
-            bytecode=data.bytecode,
-            prediction=int(prediction),
-            processing_time_ms=processing_time_ms,
-            created_at=data.created_at,
+    # Cache hits are already stored in contracts; only new predictions are saved
+    if cached is None:
+        await write_behind.add_contract(
+            {
+                "bytecode_hash": digest,
+                "model_version": MODEL_VERSION,
+                "prediction": int(prediction),
+                "processing_time_ms": processing_time_ms,
+                "created_at": data.created_at,
+            },
+            features or {},
+            to_bytes(bytecode),
         )
-        metadata = ContractMetadata(contract_rel=contract, **(features or {}))
-        db.add(contract)
-        db.add(metadata)
-        await db.commit()
-    except Exception as exc:
-        print(f"✗ Error saving contract data: {type(exc).__name__}: {exc}")
+
+    # The bytecode is in the blob store already; history keeps a reference to it
+    await write_behind.add_history({
+        "created_at": data.created_at,
+        "request_headers": None,
+        "response_status": response_status,
+        "response_data": None,
+        "processing_time_ms": processing_time_ms,
+        "bytecode_length": bytecode_length,
+        "bytecode_hash": digest,
+        "prediction": int(prediction),
+        "stage_timings_ms": stage_timings_ms,
+    })
+
+    return response_data
+
+
+def _parse_batch_body(raw_body: bytes, content_type: str) -> List[Any]:
+    """Bytecodes from a JSON array or NDJSON body; items are hex strings or {"bytecode": ...}."""
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        items = [json.loads(line) for line in raw_body.splitlines() if line.strip()]
+    else:
+        items = json.loads(raw_body)
+        if isinstance(items, dict):
+            items = items.get("bytecodes")
+        if not isinstance(items, list):
+            raise ValueError("expected a JSON array of bytecodes")
+    return [item.get("bytecode") if isinstance(item, dict) else item for item in items]
+
+
+def _item_error(bytecode: Any) -> str:
+    if bytecode is None or bytecode == "":
+        return "bytecode is required"
+    return "bytecode must be a hex string"
+
+
+async def _score_chunk(db: AsyncSession, offset: int, bytecodes: List[Any]) -> List[Dict[str, Any]]:
+    """Score one chunk and queue its contracts and history rows for persistence."""
+    created_at = datetime.now()
+    start_time = perf_counter()
+
+    digests = {
+        idx: bytecode_hash(bytecode)
+        for idx, bytecode in enumerate(bytecodes)
+        if isinstance(bytecode, str) and bytecode
+    }
+    results: Dict[str, CachedPrediction] = {}
+    for digest in set(digests.values()):
+        cached = prediction_cache.get((MODEL_VERSION, digest))
+        if cached is not None:
+            results[digest] = cached
+    for digest, cached in (await _lookup_contracts(db, set(digests.values()) - results.keys())).items():
+        prediction_cache.record_db_hit()
+        prediction_cache.put((MODEL_VERSION, digest), cached)
+        results[digest] = cached
+
+    # Each new bytecode is scored once per chunk, even if repeated
+    first_index = {}
+    for idx, digest in digests.items():
+        if digest not in results:
+            first_index.setdefault(digest, idx)
+    error = None
+    if first_index:
         try:
-            await db.rollback()
+            predictions, feature_rows = await inference_executor.predict_chunk(
+                [bytecodes[idx] for idx in first_index.values()]
+            )
+            for digest, prediction, features in zip(first_index, predictions, feature_rows):
+                results[digest] = (prediction, features)
+                prediction_cache.put((MODEL_VERSION, digest), (prediction, features))
+        except InferenceSaturated:
+            error = "inference queue is full"
+        except FileNotFoundError:
+            error = "model file not found"
         except Exception:
-            pass
+            error = "модель не смогла обработать данные"
+    processing_time_ms = int((perf_counter() - start_time) * 1000 / len(bytecodes))
+
+    lines = []
+    for idx, bytecode in enumerate(bytecodes):
+        digest = digests.get(idx)
+        bytecode_length = len(bytecode) if isinstance(bytecode, str) else None
+        if digest is None or digest not in results:
+            message = error if digest is not None and error else _item_error(bytecode)
+            lines.append({"index": offset + idx, "status": "error", "error": message})
+            await write_behind.add_history({
+                "created_at": created_at,
+                "request_headers": None,
+                "response_status": "error",
+                "response_data": {"error": message},
+                "processing_time_ms": processing_time_ms,
+                "bytecode_length": bytecode_length,
+                "bytecode_hash": digest,
+            })
+            continue
+
+        prediction, features = results[digest]
+        result = {
+            "processed": True,
+            "created_at": created_at.isoformat(),
+            "prediction": prediction,
+        }
+        lines.append({"index": offset + idx, "status": "success", "result": result})
+        await write_behind.add_history({
+            "created_at": created_at,
+            "request_headers": None,
+            "response_status": "success",
+            "response_data": None,
+            "processing_time_ms": processing_time_ms,
+            "bytecode_length": bytecode_length,
+            "bytecode_hash": digest,
+            "prediction": int(prediction),
+        })
+        if first_index.get(digest) == idx:
+            await write_behind.add_contract(
+                {
+                    "bytecode_hash": digest,
+                    "model_version": MODEL_VERSION,
+                    "prediction": int(prediction),
+                    "processing_time_ms": processing_time_ms,
+                    "created_at": created_at,
+                },
+                features,
+                to_bytes(bytecode),
+            )
+
+    return lines
+
 
+async def _stream_batch(bytecodes: List[Any]) -> AsyncIterator[str]:
+    chunk_size = max(1, settings.forward_batch_chunk_size)
+    # The streaming body outlives the request dependencies, so it owns its session
+    async with AsyncSessionLocal() as db:
+        for offset in range(0, len(bytecodes), chunk_size):
+            lines = await _score_chunk(db, offset, bytecodes[offset:offset + chunk_size])
+            yield "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines)
+
+
+@router.post("/forward/batch", tags=["forward"])
+async def forward_batch(request: Request) -> StreamingResponse:
+    """Score many bytecodes; streams one NDJSON line per contract as chunks complete."""
+    content_type = (request.headers.get("content-type") or "").lower()
+    raw_body = await _read_body(request, settings.forward_batch_max_body_bytes)
     try:
-        history_record = RequestHistory(
-            created_at=data.created_at,
-            request_headers=None,
-            response_status=response_status,
-            response_data=response_data,
-            processing_time_ms=processing_time_ms,
-            bytecode_length=bytecode_length,
+        bytecodes = _parse_batch_body(raw_body, content_type)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="invalid batch body",
+        ) from exc
+    if not bytecodes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="bytecodes are required",
         )
-        db.add(history_record)
-        await db.commit()
-        print("✓ Request saved to history")
-    except Exception as exc:
-        print(f"✗ Error saving to history: {type(exc).__name__}: {exc}")
-        try:
-            await db.rollback()
-        except Exception:
-            pass
-
-    return response_data
+    return StreamingResponse(_stream_batch(bytecodes), media_type="application/x-ndjson")
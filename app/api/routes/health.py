@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.services.evm_inference import readiness
+
+router = APIRouter()
+
+
+@router.get("/ready", tags=["health"])
+async def ready() -> JSONResponse:
+    """Readiness probe: 200 once the model is loaded and warmed up, 503 otherwise."""
+    state = readiness()
+    return JSONResponse(content=state, status_code=200 if state["ready"] else 503)
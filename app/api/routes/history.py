@@ -1,36 +1,191 @@
-from typing import List, Optional
+import base64
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Sequence, Tuple
 
-from fastapi import APIRouter, Depends, Header, HTTPException, status
-from sqlalchemy import delete, select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import Select, delete, func, select, text, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.security import decode_token, require_admin
-from app.db.session import get_db
+from app.db.base import naive_utc
+from app.db.session import AsyncSessionLocal, get_db
+from app.models.bytecode_blob import BytecodeBlob
 from app.models.request_history import RequestHistory
+from app.models.request_rollup import RequestRollup
 from app.schemas.history import HistoryResponse
+from app.services.bytecode_store import to_hex
+from app.services.stats_service import request_stats
 
 router = APIRouter()
 
 
+_HISTORY_COLUMNS = tuple(RequestHistory.__table__.columns)
+_HISTORY_FIELDS = tuple(column.name for column in _HISTORY_COLUMNS)
+_HISTORY_LIST = TypeAdapter(List[HistoryResponse])
+_INCLUDE = Query([], description="Extra fields to hydrate; 'bytecode' adds the hex bytecode of each row")
+
+
+def _encode_cursor(timestamp: datetime, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{row_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        timestamp, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        ) from exc
+
+
+def _filtered(
+    since: Optional[datetime],
+    until: Optional[datetime],
+    response_status: Optional[str],
+    include_bytecode: bool = False,
+) -> Select:
+    """History rows with ``since <= timestamp < until`` and the given status."""
+    query = select(*_HISTORY_COLUMNS)
+    if include_bytecode:
+        query = query.add_columns(BytecodeBlob.data.label("bytecode_blob")).outerjoin(
+            BytecodeBlob, BytecodeBlob.hash == RequestHistory.bytecode_hash
+        )
+    if since is not None:
+        query = query.where(RequestHistory.timestamp >= naive_utc(since))
+    if until is not None:
+        query = query.where(RequestHistory.timestamp < naive_utc(until))
+    if response_status is not None:
+        query = query.where(RequestHistory.response_status == response_status)
+    return query
+
+
+def _hydrated(rows: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Rows with the joined blob replaced by the bytecode as hex."""
+    hydrated = []
+    for row in rows:
+        row = dict(row)
+        data = row.pop("bytecode_blob")
+        row["bytecode"] = to_hex(data) if data is not None else None
+        hydrated.append(row)
+    return hydrated
+
+
 @router.get("/history", tags=["history"], response_model=List[HistoryResponse])
 async def get_history(
     db: AsyncSession = Depends(get_db),
-    limit: int = 100,
-) -> List[HistoryResponse]:
-    """Get history of all requests."""
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    response_status: Optional[str] = Query(None, alias="status"),
+    include: List[Literal["bytecode"]] = _INCLUDE,
+) -> Response:
+    """Get history of requests, newest first.
+
+    Pages are keyed on (timestamp, id): pass the ``X-Next-Cursor`` header of a
+    response as ``cursor`` to fetch the next page. The header is absent on the
+    last page. Rows reference the scored bytecode by ``bytecode_hash``; it is
+    only loaded with ``include=bytecode``.
+    """
+    include_bytecode = "bytecode" in include
+    query = _filtered(since, until, response_status, include_bytecode)
+    if cursor is not None:
+        query = query.where(
+            tuple_(RequestHistory.timestamp, RequestHistory.id) < _decode_cursor(cursor)
+        )
     try:
         result = await db.execute(
-            select(RequestHistory)
-            .order_by(RequestHistory.timestamp.desc())
+            query
+            .order_by(RequestHistory.timestamp.desc(), RequestHistory.id.desc())
             .limit(limit)
         )
-        history_records = result.scalars().all()
-        return [HistoryResponse.model_validate(record) for record in history_records]
+        rows = result.mappings().all()
+        if include_bytecode:
+            rows = _hydrated(rows)
     except Exception as exc:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f"Database connection error: {exc}",
         )
+    headers = {}
+    if len(rows) == limit:
+        headers["X-Next-Cursor"] = _encode_cursor(rows[-1]["timestamp"], rows[-1]["id"])
+    return Response(
+        content=_HISTORY_LIST.dump_json(_HISTORY_LIST.validate_python(rows)),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _ndjson_chunk(rows: List[Dict[str, Any]]) -> str:
+    return "".join(json.dumps(dict(row), default=_json_default, ensure_ascii=False) + "\n" for row in rows)
+
+
+def _csv_chunk(rows: List[Dict[str, Any]], fields: Sequence[str], header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(fields)
+    for row in rows:
+        writer.writerow(
+            json.dumps(value, ensure_ascii=False) if isinstance(value, dict)
+            else value.isoformat() if isinstance(value, datetime)
+            else value
+            for value in (row[name] for name in fields)
+        )
+    return buffer.getvalue()
+
+
+async def _stream_export(query: Select, export_format: str, include_bytecode: bool) -> AsyncIterator[str]:
+    chunk_size = max(1, settings.history_export_chunk_size)
+    fields = _HISTORY_FIELDS + ("bytecode",) if include_bytecode else _HISTORY_FIELDS
+    if export_format == "csv":
+        yield _csv_chunk([], fields, header=True)
+    # The streaming body outlives the request dependencies, so it owns its session
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=chunk_size))
+        async for partition in result.mappings().partitions():
+            if include_bytecode:
+                partition = _hydrated(partition)
+            if export_format == "csv":
+                yield _csv_chunk(partition, fields, header=False)
+            else:
+                yield _ndjson_chunk(partition)
+
+
+@router.get("/history/export", tags=["history"])
+async def export_history(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    response_status: Optional[str] = Query(None, alias="status"),
+    include: List[Literal["bytecode"]] = _INCLUDE,
+) -> StreamingResponse:
+    """Stream matching history rows, oldest first, through a server-side cursor."""
+    include_bytecode = "bytecode" in include
+    query = _filtered(since, until, response_status, include_bytecode).order_by(
+        RequestHistory.timestamp, RequestHistory.id
+    )
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _stream_export(query, export_format, include_bytecode),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="history.{export_format}"'},
+    )
 
 
 @router.delete("/history", tags=["history"])
@@ -56,9 +211,17 @@ async def delete_history(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Invalid confirmation token",
             )
-        result = await db.execute(delete(RequestHistory))
+        if db.bind.dialect.name == "postgresql":
+            # TRUNCATE empties every partition without a row-by-row delete
+            deleted = await db.scalar(select(func.count()).select_from(RequestHistory))
+            await db.execute(text(f"TRUNCATE TABLE {RequestHistory.__tablename__}"))
+        else:
+            deleted = (await db.execute(delete(RequestHistory))).rowcount
+        await db.execute(delete(RequestRollup))
         await db.commit()
-        return {"deleted": result.rowcount or 0}
+        request_stats.reset()
+        await request_stats.persist(replace=True)
+        return {"deleted": deleted or 0}
     except Exception as exc:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
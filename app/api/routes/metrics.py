@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.core.security import require_metrics_access
+from app.services.metrics import registry
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics",
+    tags=["metrics"],
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_metrics_access)],
+)
+async def metrics() -> PlainTextResponse:
+    """Prometheus metrics in text exposition format, summed over all web workers.
+
+    Requires ``Authorization: Bearer <METRICS_TOKEN>`` or an admin access token:
+    the app is served publicly through nginx and the metrics expose traffic and
+    route details.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
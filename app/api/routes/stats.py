@@ -1,44 +1,75 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import require_admin
+from app.db.base import naive_utc
 from app.db.session import get_db
-from app.models.request_history import RequestHistory
-from app.services.stats_service import build_stats
+from app.services.evm_inference import prediction_batcher
+from app.services.inference_executor import inference_executor
+from app.services.prediction_cache import prediction_cache
+from app.services.rollup_service import ROLLUP_BUCKETS, rollup_series
+from app.services.stats_service import request_stats
+from app.services.write_behind import write_behind
 
 router = APIRouter()
 
+_MAX_SERIES_POINTS = 10080  # a week of minutes
+_DEFAULT_SERIES_POINTS = 60
+
 
 @router.get("/stats", tags=["stats"])
 async def get_stats(
-    db: AsyncSession = Depends(get_db),
     _user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    bucket: Optional[Literal["minute", "hour"]] = None,
 ) -> dict:
-    """Return request statistics (admin only)."""
-    try:
-        result = await db.execute(
-            select(
-                RequestHistory.processing_time_ms,
-                RequestHistory.bytecode_length,
-            )
-        )
-        rows = result.all()
-
-        processing_times = [row[0] for row in rows if row[0] is not None]
-        bytecode_lengths = [row[1] for row in rows if row[1] is not None]
+    """Return request statistics (admin only).
 
-        stats = build_stats(
-            processing_times,
-            bytecode_lengths,
-        )
+    Without parameters, all-time quantiles come from incrementally maintained
+    sketches and are within ``relative_error`` of the exact values; means and
+    counts are exact. ``stage_timings_ms`` breaks /forward latency down by stage.
+    ``prediction_cache``, ``inference``, ``prediction_batches`` and
+    ``write_behind`` are counters of the worker process that answered; with
+    several web workers each one has its own.
 
+    With ``from``/``to``/``bucket`` the response is a time series read from the
+    per-minute or per-hour rollups (default: hourly, last 60 buckets). Counts,
+    means, min and max are exact; quantiles are the upper edge of the latency
+    histogram bin that contains them.
+    """
+    if start is None and end is None and bucket is None:
         return {
-            "total_requests": len(rows),
-            "stats": stats,
+            **request_stats.snapshot(),
+            "prediction_cache": prediction_cache.stats(),
+            "inference": inference_executor.stats(),
+            "prediction_batches": prediction_batcher.stats(),
+            "write_behind": write_behind.stats(),
         }
+
+    bucket = bucket or "hour"
+    step = ROLLUP_BUCKETS[bucket]
+    end = naive_utc(end) if end is not None else datetime.utcnow()
+    start = naive_utc(start) if start is not None else end - step * _DEFAULT_SERIES_POINTS
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must be earlier than 'to'",
+        )
+    if (end - start) / step > _MAX_SERIES_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Window too large: at most {_MAX_SERIES_POINTS} {bucket} buckets",
+        )
+    try:
+        series = await rollup_series(db, bucket, start, end)
     except Exception as exc:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f"Database connection error: {exc}",
         )
+    return {"bucket": bucket, "from": start, "to": end, **series}
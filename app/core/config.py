@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -26,11 +27,61 @@ class Settings:
                 f"{ssl_query}"
             )
 
+        self.db_pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
+        self.db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+        self.db_pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+        self.db_pool_recycle = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+        self.db_pool_pre_ping = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+        self.db_statement_cache_size = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+
+        # Only used with DATABASE_URL=sqlite+aiosqlite:///path/to/app.db
+        self.sqlite_busy_timeout_ms = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+        self.sqlite_synchronous = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+        self.sqlite_cache_size_kb = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+
         self.jwt_secret_key = os.getenv("JWT_SECRET_KEY", "change_me")
         self.jwt_algorithm = os.getenv("JWT_ALGORITHM", "HS256")
         self.jwt_expires_minutes = int(os.getenv("JWT_EXPIRES_MINUTES", "60"))
         self.admin_username = os.getenv("ADMIN_USERNAME", "admin")
         self.admin_password = os.getenv("ADMIN_PASSWORD", "admin")
 
+        # WEB_WORKERS > 1 makes app.sh serve through gunicorn.conf.py (preforked workers)
+        self.web_workers = int(os.getenv("WEB_WORKERS", "1"))
+        self.web_max_requests = int(os.getenv("WEB_MAX_REQUESTS", "0"))
+        self.web_max_requests_jitter = int(os.getenv("WEB_MAX_REQUESTS_JITTER", "0"))
+        self.web_worker_timeout = int(os.getenv("WEB_WORKER_TIMEOUT", "60"))
+
+        self.model_path = os.getenv("MODEL_PATH")
+        self.prediction_cache_size = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+        self.inference_workers = int(os.getenv("INFERENCE_WORKERS", "2"))
+        self.inference_queue_size = int(os.getenv("INFERENCE_QUEUE_SIZE", "32"))
+        self.predict_batch_size = int(os.getenv("PREDICT_BATCH_SIZE", "32"))
+        self.predict_batch_wait_ms = float(os.getenv("PREDICT_BATCH_WAIT_MS", "2"))
+        self.forward_max_body_bytes = int(os.getenv("FORWARD_MAX_BODY_BYTES", "262144"))
+        self.forward_batch_max_body_bytes = int(os.getenv("FORWARD_BATCH_MAX_BODY_BYTES", "16777216"))
+        self.forward_batch_chunk_size = int(os.getenv("FORWARD_BATCH_CHUNK_SIZE", "256"))
+        self.write_behind_queue_size = int(os.getenv("WRITE_BEHIND_QUEUE_SIZE", "10000"))
+        self.write_behind_batch_size = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "500"))
+        self.write_behind_flush_interval_ms = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL_MS", "200"))
+        self.write_behind_max_retries = int(os.getenv("WRITE_BEHIND_MAX_RETRIES", "3"))
+        self.write_behind_retry_backoff_ms = float(os.getenv("WRITE_BEHIND_RETRY_BACKOFF_MS", "100"))
+        self.history_export_chunk_size = int(os.getenv("HISTORY_EXPORT_CHUNK_SIZE", "1000"))
+        self.history_retention_days = int(os.getenv("HISTORY_RETENTION_DAYS", "90"))
+        self.history_partition_premake_days = int(os.getenv("HISTORY_PARTITION_PREMAKE_DAYS", "7"))
+        self.history_retention_interval_s = float(os.getenv("HISTORY_RETENTION_INTERVAL_S", "3600"))
+        # Held by the one worker that runs history retention and the stats rebuild
+        self.leader_lock_path = os.getenv(
+            "LEADER_LOCK_PATH", os.path.join(tempfile.gettempdir(), "evm-api-leader.lock")
+        )
+        # Shared by the web workers to add up /metrics (set by gunicorn.conf.py)
+        self.metrics_dir = os.getenv("METRICS_DIR")
+        self.metrics_dump_interval_s = float(os.getenv("METRICS_DUMP_INTERVAL_S", "5"))
+        # Static bearer token for Prometheus; admin access tokens are accepted too
+        self.metrics_token = os.getenv("METRICS_TOKEN")
+        self.profile_sample_rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+        self.profile_interval_ms = float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+        self.stats_sketch_relative_accuracy = float(os.getenv("STATS_SKETCH_RELATIVE_ACCURACY", "0.01"))
+        self.stats_sketch_persist_interval_s = float(os.getenv("STATS_SKETCH_PERSIST_INTERVAL_S", "60"))
+
 
 settings = Settings()
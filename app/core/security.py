@@ -1,3 +1,4 @@
+import hmac
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 
@@ -56,3 +57,16 @@ def require_admin(user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str,
     if not user.get("is_admin"):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
     return user
+
+
+def require_metrics_access(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> None:
+    """Accept the static ``METRICS_TOKEN`` (for scrapers) or an admin access token."""
+    if credentials is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
+    if settings.metrics_token and hmac.compare_digest(
+        credentials.credentials.encode(), settings.metrics_token.encode()
+    ):
+        return
+    require_admin(decode_token(credentials.credentials))
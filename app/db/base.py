@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from typing import Any
 
 from sqlalchemy.types import JSON
@@ -8,3 +9,10 @@ Base = declarative_base(
         dict[str, Any]: JSON
     }
 )
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Timestamps are stored as naive UTC; convert aware datetimes before comparing."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
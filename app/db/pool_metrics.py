@@ -0,0 +1,89 @@
+from bisect import bisect_left
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Dict, Sequence
+
+from sqlalchemy.engine import Dialect
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+_DEFAULT_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (milliseconds); bins are non-cumulative."""
+
+    def __init__(self, bounds_ms: Sequence[float] = _DEFAULT_BOUNDS_MS) -> None:
+        self.bounds_ms = tuple(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = Lock()
+
+    def observe(self, value_ms: float) -> None:
+        with self._lock:
+            self.counts[bisect_left(self.bounds_ms, value_ms)] += 1
+            self.count += 1
+            self.sum_ms += value_ms
+            self.max_ms = max(self.max_ms, value_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            keys = [str(bound) for bound in self.bounds_ms] + ["inf"]
+            return {
+                "count": self.count,
+                "mean_ms": self.sum_ms / self.count if self.count else None,
+                "max_ms": self.max_ms,
+                "buckets_ms": dict(zip(keys, self.counts)),
+            }
+
+
+class PoolMetrics:
+    """Checkout wait and pre-ping timings for the application engine's pool."""
+
+    def __init__(self) -> None:
+        self.checkout_wait = LatencyHistogram()
+        self.pre_ping = LatencyHistogram()
+        self.checkout_timeouts = 0
+
+    def instrument_dialect(self, dialect: Dialect) -> None:
+        """Time every pre-ping the pool issues through ``dialect``."""
+        do_ping: Callable[[Any], bool] = dialect.do_ping
+
+        def timed_ping(dbapi_connection: Any) -> bool:
+            start = perf_counter()
+            try:
+                return do_ping(dbapi_connection)
+            finally:
+                self.pre_ping.observe((perf_counter() - start) * 1000)
+
+        dialect.do_ping = timed_ping
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "checkout_wait_ms": self.checkout_wait.snapshot(),
+            "pre_ping_ms": self.pre_ping.snapshot(),
+            "checkout_timeouts": self.checkout_timeouts,
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection.
+
+    The wait covers queueing for a free slot and opening a new connection
+    when the pool grows; pre-ping is timed separately.
+    """
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.checkout_timeouts += 1
+            raise
+        finally:
+            pool_metrics.checkout_wait.observe((perf_counter() - start) * 1000)
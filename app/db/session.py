@@ -1,16 +1,58 @@
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict
 
-from sqlalchemy import text
+from sqlalchemy import event, make_url, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import QueuePool, StaticPool
 
 from app.core.config import settings
 from app.db.base import Base
+from app.db.pool_metrics import InstrumentedQueuePool, pool_metrics
+
+
+def _engine_options(database_url: str) -> Dict[str, Any]:
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # Every connection to :memory: is a new empty database, so share one
+        return {"poolclass": StaticPool}
+    options: Dict[str, Any] = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if url.get_driver_name() == "asyncpg":
+        # asyncpg's own statement cache and SQLAlchemy's prepared-statement cache;
+        # set both to 0 behind PgBouncer in transaction mode
+        options["connect_args"] = {
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        }
+    return options
+
 
 engine = create_async_engine(
     settings.database_url,
-    pool_pre_ping=True,
     echo=False,
+    **_engine_options(settings.database_url),
 )
+pool_metrics.instrument_dialect(engine.dialect)
+
+
+if engine.dialect.name == "sqlite":
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _configure_sqlite(dbapi_connection: Any, _connection_record: Any) -> None:
+        """WAL lets readers run alongside the single writer; busy_timeout makes writers queue instead of failing."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+        cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
 
 AsyncSessionLocal = async_sessionmaker[AsyncSession](
     engine,
@@ -36,3 +78,23 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     except Exception as exc:
         print(f"Database connection error in get_db: {exc}")
         raise
+
+
+def pool_status() -> Dict[str, Any]:
+    """Live connection counts of the engine's pool plus checkout/pre-ping timings."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool_class": type(pool).__name__, **pool_metrics.snapshot()}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pre_ping": settings.db_pool_pre_ping,
+        "statement_cache_size": settings.db_statement_cache_size,
+        "max_connections": settings.db_pool_size + settings.db_max_overflow,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        **pool_metrics.snapshot(),
+    }
@@ -0,0 +1,263 @@
+"""
+Табличный однопроходный декодер EVM-байткода.
+
+Заменяет ``pyevmasm.disassemble_all``: вместо списка объектов ``Instruction``
+возвращает компактные NumPy-массивы опкодов, идентификаторов мнемоник и PC.
+Таблица опкодов соответствует форку Istanbul (форк по умолчанию в pyevmasm),
+поэтому признаки совпадают с прежним дизассемблером.
+"""
+from typing import NamedTuple, Union
+
+import numpy as np
+
+# opcode: (мнемоника, pops, pushes, fee, длина immediate-операнда)
+_OPCODE_TABLE = {
+    0x00: ("STOP", 0, 0, 0, 0),
+    0x01: ("ADD", 2, 1, 3, 0),
+    0x02: ("MUL", 2, 1, 5, 0),
+    0x03: ("SUB", 2, 1, 3, 0),
+    0x04: ("DIV", 2, 1, 5, 0),
+    0x05: ("SDIV", 2, 1, 5, 0),
+    0x06: ("MOD", 2, 1, 5, 0),
+    0x07: ("SMOD", 2, 1, 5, 0),
+    0x08: ("ADDMOD", 3, 1, 8, 0),
+    0x09: ("MULMOD", 3, 1, 8, 0),
+    0x0A: ("EXP", 2, 1, 10, 0),
+    0x0B: ("SIGNEXTEND", 2, 1, 5, 0),
+    0x10: ("LT", 2, 1, 3, 0),
+    0x11: ("GT", 2, 1, 3, 0),
+    0x12: ("SLT", 2, 1, 3, 0),
+    0x13: ("SGT", 2, 1, 3, 0),
+    0x14: ("EQ", 2, 1, 3, 0),
+    0x15: ("ISZERO", 1, 1, 3, 0),
+    0x16: ("AND", 2, 1, 3, 0),
+    0x17: ("OR", 2, 1, 3, 0),
+    0x18: ("XOR", 2, 1, 3, 0),
+    0x19: ("NOT", 1, 1, 3, 0),
+    0x1A: ("BYTE", 2, 1, 3, 0),
+    0x1B: ("SHL", 2, 1, 3, 0),
+    0x1C: ("SHR", 2, 1, 3, 0),
+    0x1D: ("SAR", 2, 1, 3, 0),
+    0x20: ("SHA3", 2, 1, 30, 0),
+    0x30: ("ADDRESS", 0, 1, 2, 0),
+    0x31: ("BALANCE", 1, 1, 700, 0),
+    0x32: ("ORIGIN", 0, 1, 2, 0),
+    0x33: ("CALLER", 0, 1, 2, 0),
+    0x34: ("CALLVALUE", 0, 1, 2, 0),
+    0x35: ("CALLDATALOAD", 1, 1, 3, 0),
+    0x36: ("CALLDATASIZE", 0, 1, 2, 0),
+    0x37: ("CALLDATACOPY", 3, 0, 3, 0),
+    0x38: ("CODESIZE", 0, 1, 2, 0),
+    0x39: ("CODECOPY", 3, 0, 3, 0),
+    0x3A: ("GASPRICE", 0, 1, 2, 0),
+    0x3B: ("EXTCODESIZE", 1, 1, 700, 0),
+    0x3C: ("EXTCODECOPY", 4, 0, 700, 0),
+    0x3D: ("RETURNDATASIZE", 0, 1, 2, 0),
+    0x3E: ("RETURNDATACOPY", 3, 0, 3, 0),
+    0x3F: ("EXTCODEHASH", 1, 1, 700, 0),
+    0x40: ("BLOCKHASH", 1, 1, 20, 0),
+    0x41: ("COINBASE", 0, 1, 2, 0),
+    0x42: ("TIMESTAMP", 0, 1, 2, 0),
+    0x43: ("NUMBER", 0, 1, 2, 0),
+    0x44: ("DIFFICULTY", 0, 1, 2, 0),
+    0x45: ("GASLIMIT", 0, 1, 2, 0),
+    0x46: ("CHAINID", 0, 1, 2, 0),
+    0x47: ("SELFBALANCE", 0, 1, 5, 0),
+    0x50: ("POP", 1, 0, 2, 0),
+    0x51: ("MLOAD", 1, 1, 3, 0),
+    0x52: ("MSTORE", 2, 0, 3, 0),
+    0x53: ("MSTORE8", 2, 0, 3, 0),
+    0x54: ("SLOAD", 1, 1, 800, 0),
+    0x55: ("SSTORE", 2, 0, 0, 0),
+    0x56: ("JUMP", 1, 0, 8, 0),
+    0x57: ("JUMPI", 2, 0, 10, 0),
+    0x58: ("GETPC", 0, 1, 2, 0),
+    0x59: ("MSIZE", 0, 1, 2, 0),
+    0x5A: ("GAS", 0, 1, 2, 0),
+    0x5B: ("JUMPDEST", 0, 0, 1, 0),
+    0x60: ("PUSH1", 0, 1, 3, 1),
+    0x61: ("PUSH2", 0, 1, 3, 2),
+    0x62: ("PUSH3", 0, 1, 3, 3),
+    0x63: ("PUSH4", 0, 1, 3, 4),
+    0x64: ("PUSH5", 0, 1, 3, 5),
+    0x65: ("PUSH6", 0, 1, 3, 6),
+    0x66: ("PUSH7", 0, 1, 3, 7),
+    0x67: ("PUSH8", 0, 1, 3, 8),
+    0x68: ("PUSH9", 0, 1, 3, 9),
+    0x69: ("PUSH10", 0, 1, 3, 10),
+    0x6A: ("PUSH11", 0, 1, 3, 11),
+    0x6B: ("PUSH12", 0, 1, 3, 12),
+    0x6C: ("PUSH13", 0, 1, 3, 13),
+    0x6D: ("PUSH14", 0, 1, 3, 14),
+    0x6E: ("PUSH15", 0, 1, 3, 15),
+    0x6F: ("PUSH16", 0, 1, 3, 16),
+    0x70: ("PUSH17", 0, 1, 3, 17),
+    0x71: ("PUSH18", 0, 1, 3, 18),
+    0x72: ("PUSH19", 0, 1, 3, 19),
+    0x73: ("PUSH20", 0, 1, 3, 20),
+    0x74: ("PUSH21", 0, 1, 3, 21),
+    0x75: ("PUSH22", 0, 1, 3, 22),
+    0x76: ("PUSH23", 0, 1, 3, 23),
+    0x77: ("PUSH24", 0, 1, 3, 24),
+    0x78: ("PUSH25", 0, 1, 3, 25),
+    0x79: ("PUSH26", 0, 1, 3, 26),
+    0x7A: ("PUSH27", 0, 1, 3, 27),
+    0x7B: ("PUSH28", 0, 1, 3, 28),
+    0x7C: ("PUSH29", 0, 1, 3, 29),
+    0x7D: ("PUSH30", 0, 1, 3, 30),
+    0x7E: ("PUSH31", 0, 1, 3, 31),
+    0x7F: ("PUSH32", 0, 1, 3, 32),
+    0x80: ("DUP1", 1, 2, 3, 0),
+    0x81: ("DUP2", 2, 3, 3, 0),
+    0x82: ("DUP3", 3, 4, 3, 0),
+    0x83: ("DUP4", 4, 5, 3, 0),
+    0x84: ("DUP5", 5, 6, 3, 0),
+    0x85: ("DUP6", 6, 7, 3, 0),
+    0x86: ("DUP7", 7, 8, 3, 0),
+    0x87: ("DUP8", 8, 9, 3, 0),
+    0x88: ("DUP9", 9, 10, 3, 0),
+    0x89: ("DUP10", 10, 11, 3, 0),
+    0x8A: ("DUP11", 11, 12, 3, 0),
+    0x8B: ("DUP12", 12, 13, 3, 0),
+    0x8C: ("DUP13", 13, 14, 3, 0),
+    0x8D: ("DUP14", 14, 15, 3, 0),
+    0x8E: ("DUP15", 15, 16, 3, 0),
+    0x8F: ("DUP16", 16, 17, 3, 0),
+    0x90: ("SWAP1", 2, 2, 3, 0),
+    0x91: ("SWAP2", 3, 3, 3, 0),
+    0x92: ("SWAP3", 4, 4, 3, 0),
+    0x93: ("SWAP4", 5, 5, 3, 0),
+    0x94: ("SWAP5", 6, 6, 3, 0),
+    0x95: ("SWAP6", 7, 7, 3, 0),
+    0x96: ("SWAP7", 8, 8, 3, 0),
+    0x97: ("SWAP8", 9, 9, 3, 0),
+    0x98: ("SWAP9", 10, 10, 3, 0),
+    0x99: ("SWAP10", 11, 11, 3, 0),
+    0x9A: ("SWAP11", 12, 12, 3, 0),
+    0x9B: ("SWAP12", 13, 13, 3, 0),
+    0x9C: ("SWAP13", 14, 14, 3, 0),
+    0x9D: ("SWAP14", 15, 15, 3, 0),
+    0x9E: ("SWAP15", 16, 16, 3, 0),
+    0x9F: ("SWAP16", 17, 17, 3, 0),
+    0xA0: ("LOG0", 2, 0, 375, 0),
+    0xA1: ("LOG1", 3, 0, 750, 0),
+    0xA2: ("LOG2", 4, 0, 1125, 0),
+    0xA3: ("LOG3", 5, 0, 1500, 0),
+    0xA4: ("LOG4", 6, 0, 1875, 0),
+    0xF0: ("CREATE", 3, 1, 32000, 0),
+    0xF1: ("CALL", 7, 1, 700, 0),
+    0xF2: ("CALLCODE", 7, 1, 700, 0),
+    0xF3: ("RETURN", 2, 0, 0, 0),
+    0xF4: ("DELEGATECALL", 6, 1, 700, 0),
+    0xF5: ("CREATE2", 3, 1, 32000, 0),
+    0xFA: ("STATICCALL", 6, 1, 40, 0),
+    0xFD: ("REVERT", 2, 0, 0, 0),
+    0xFE: ("INVALID", 0, 0, 0, 0),
+    0xFF: ("SELFDESTRUCT", 1, 0, 5000, 0),
+}
+
+# Неизвестные опкоды pyevmasm декодирует как INVALID без операнда и без стоимости
+_INVALID_ENTRY = ("INVALID", 0, 0, 0, 0)
+
+# Группы по классификации Yellow Paper (старший полубайт опкода)
+GROUP_NAMES = {
+    0x0: "Stop and Arithmetic Operations",
+    0x1: "Comparison & Bitwise Logic Operations",
+    0x2: "SHA3",
+    0x3: "Environmental Information",
+    0x4: "Block Information",
+    0x5: "Stack, Memory, Storage and Flow Operations",
+    0x6: "Push Operations",
+    0x7: "Push Operations",
+    0x8: "Duplication Operations",
+    0x9: "Exchange Operations",
+    0xA: "Logging Operations",
+    0xF: "System operations",
+}
+ENVIRONMENTAL_GROUP = 0x3
+
+MNEMONICS = tuple(dict.fromkeys(entry[0] for entry in _OPCODE_TABLE.values()))
+MNEMONIC_IDS = {name: idx for idx, name in enumerate(MNEMONICS)}
+
+_ENTRIES = [_OPCODE_TABLE.get(opcode, _INVALID_ENTRY) for opcode in range(256)]
+
+# 256-элементные таблицы, индексируемые байтом опкода
+OPCODE_MNEMONIC = np.array([MNEMONIC_IDS[entry[0]] for entry in _ENTRIES], dtype=np.int16)
+OPCODE_GROUP = np.arange(256, dtype=np.uint8) >> 4
+OPCODE_POPS = np.array([entry[1] for entry in _ENTRIES], dtype=np.int64)
+OPCODE_PUSHES = np.array([entry[2] for entry in _ENTRIES], dtype=np.int64)
+OPCODE_FEE = np.array([entry[3] for entry in _ENTRIES], dtype=np.int64)
+OPCODE_IMMEDIATE = np.array([entry[4] for entry in _ENTRIES], dtype=np.int64)
+
+# Матрица 256 × len(MNEMONICS): свёртка частот опкодов в частоты мнемоник умножением
+OPCODE_MNEMONIC_MATRIX = np.zeros((256, len(MNEMONICS)), dtype=np.int64)
+OPCODE_MNEMONIC_MATRIX[np.arange(256), OPCODE_MNEMONIC] = 1
+
+
+class DecodedBytecode(NamedTuple):
+    """Результат декодирования: параллельные массивы по инструкциям."""
+
+    opcodes: np.ndarray
+    mnemonic_ids: np.ndarray
+    pcs: np.ndarray
+
+
+_EMPTY = DecodedBytecode(
+    opcodes=np.empty(0, dtype=np.uint8),
+    mnemonic_ids=np.empty(0, dtype=np.int16),
+    pcs=np.empty(0, dtype=np.int64),
+)
+
+
+def to_bytes(bytecode: Union[str, bytes, bytearray, memoryview, None]) -> bytes:
+    """Нормализация входа: hex-строка (с 0x или без) или сырые байты."""
+    if isinstance(bytecode, str):
+        bytecode = bytecode.strip()
+        if bytecode.startswith("0x"):
+            bytecode = bytecode[2:]
+        if not bytecode:
+            return b""
+        try:
+            return bytes.fromhex(bytecode)
+        except ValueError:
+            return b""
+    return bytes(bytecode) if bytecode is not None else b""
+
+
+def decode(code: bytes) -> DecodedBytecode:
+    """
+    Декодирование байткода за один проход.
+
+    Python-цикл идёт только по PUSH-инструкциям (только они сдвигают границы
+    инструкций), остальное считается векторно. Обрезанный в конце PUSH
+    отбрасывается вместе с хвостом, как в pyevmasm.
+    """
+    data = np.frombuffer(code, dtype=np.uint8)
+    size = data.size
+    if size == 0:
+        return _EMPTY
+
+    immediate = OPCODE_IMMEDIATE[data]
+    # Границы покрытых immediate-операндами участков: +1 в начале, -1 после конца
+    coverage = np.zeros(size + 1, dtype=np.int64)
+    limit = size
+    covered_until = 0
+    for pc, length in zip(np.flatnonzero(immediate).tolist(), immediate[immediate > 0].tolist()):
+        if pc < covered_until:
+            continue
+        end = pc + 1 + length
+        if end > size:
+            limit = pc
+            break
+        coverage[pc + 1] += 1
+        coverage[end] -= 1
+        covered_until = end
+
+    is_instruction = np.cumsum(coverage[:size]) == 0
+    pcs = np.flatnonzero(is_instruction[:limit])
+    opcodes = data[pcs]
+    return DecodedBytecode(
+        opcodes=opcodes,
+        mnemonic_ids=OPCODE_MNEMONIC[opcodes],
+        pcs=pcs,
+    )
@@ -1,12 +1,70 @@
 from joblib import Parallel, delayed
 from sklearn.base import BaseEstimator, TransformerMixin
-from pyevmasm import disassemble_all
 import multiprocessing as mp
 import numpy as np
+from scipy.special import entr
 from scipy.stats import entropy
-from collections import Counter
 import pandas as pd
 
+from app.features.evm_decoder import (
+    ENVIRONMENTAL_GROUP,
+    DecodedBytecode,
+    MNEMONICS,
+    MNEMONIC_IDS,
+    OPCODE_FEE,
+    OPCODE_GROUP,
+    OPCODE_MNEMONIC,
+    OPCODE_MNEMONIC_MATRIX,
+    OPCODE_POPS,
+    OPCODE_PUSHES,
+    decode,
+    to_bytes,
+)
+
+# Группы мнемоник, общие для построчного и пакетного режимов
+_BLOCK_DEPENDENT = ("TIMESTAMP", "NUMBER", "DIFFICULTY", "GASLIMIT", "COINBASE", "BLOCKHASH")
+_CALL_OPS = ("CALL", "DELEGATECALL", "STATICCALL", "CALLCODE")
+_ARITHMETIC_OPS = ("ADD", "SUB", "MUL", "DIV", "MOD", "SDIV", "SMOD", "EXP", "SIGNEXTEND")
+_DANGEROUS_OPS = _BLOCK_DEPENDENT + _CALL_OPS + _ARITHMETIC_OPS + ("SELFDESTRUCT",)
+_RANDOMNESS_OPS = ("BLOCKHASH", "TIMESTAMP", "DIFFICULTY", "COINBASE")
+_CONTROL_FLOW_OPS = ("JUMP", "JUMPI", "RETURN", "REVERT", "STOP", "INVALID")
+
+# PC-паттерны «op из A, затем op из B строго позже и ближе window байт».
+# Эвристика (не учитывает JUMP); новый паттерн = новая строка + имя в feature_names_.
+_PC_PATTERNS = (
+    ("potential_reentrancy_pattern", ("SSTORE",), _CALL_OPS, 20),
+    ("unsafe_arithmetic_pattern", _ARITHMETIC_OPS, ("JUMPI",), 5),
+    ("balance_before_external_call", ("BALANCE",), _CALL_OPS, 10),
+)
+_PATTERN_NAMES = tuple(name for name, *_ in _PC_PATTERNS)
+
+
+def _mnemonic_mask(ops) -> np.ndarray:
+    mask = np.zeros(len(MNEMONICS), dtype=bool)
+    mask[[MNEMONIC_IDS[op] for op in ops]] = True
+    return mask
+
+
+_PATTERN_LOOKUPS = tuple(
+    (name, _mnemonic_mask(first), _mnemonic_mask(then), window)
+    for name, first, then, window in _PC_PATTERNS
+)
+
+
+def _followed_within(first_pcs, then_pcs, window) -> int:
+    """
+    Есть ли для какого-то PC из first_pcs PC из then_pcs в интервале (pc, pc + window).
+
+    Оба массива отсортированы, поэтому достаточно ближайшего следующего
+    then-PC для каждого first-PC: searchsorted, O((|A| + |B|) log |B|).
+    """
+    if first_pcs.size == 0 or then_pcs.size == 0:
+        return 0
+    nearest = np.searchsorted(then_pcs, first_pcs, side="right")
+    has_next = nearest < then_pcs.size
+    return int(np.any(then_pcs[nearest[has_next]] - first_pcs[has_next] < window))
+
+
 class EVMBytecodeFeatureExtractor(BaseEstimator, TransformerMixin):
     """
     Трансформер признаков из EVM-байткода для задач детекции уязвимостей смарт-контрактов.
@@ -64,110 +122,72 @@ class EVMBytecodeFeatureExtractor(BaseEstimator, TransformerMixin):
             "has_dos_vulnerabilities",
         ]
 
+    @staticmethod
+    def _detect_patterns(decoded) -> tuple:
+        """Флаги PC-паттернов из _PC_PATTERNS (в том же порядке)"""
+        ids, pcs = decoded.mnemonic_ids, decoded.pcs
+        return tuple(
+            _followed_within(pcs[first[ids]], pcs[then[ids]], window)
+            for _, first, then, window in _PATTERN_LOOKUPS
+        )
+
     def _extract_features_single(self, bytecode) -> dict:
         """Извлечение признаков из одного байткода (hex-строка или bytes)"""
-        if isinstance(bytecode, str):
-            bytecode = bytecode.strip()
-            if bytecode.startswith("0x"):
-                bytecode = bytecode[2:]
-            if not bytecode:
-                bytecode_bytes = b""
-            else:
-                try:
-                    bytecode_bytes = bytes.fromhex(bytecode)
-                except ValueError:
-                    bytecode_bytes = b""
-        else:
-            bytecode_bytes = bytes(bytecode) if bytecode is not None else b""
+        return self._features_from_decoded(decode(to_bytes(bytecode)))
 
-        try:
-            instructions = list(disassemble_all(bytecode_bytes))
-        except Exception:
-            instructions = []
-        n = len(instructions)
+    def _features_from_decoded(self, decoded: DecodedBytecode) -> dict:
+        """Признаки по уже дизассемблированному байткоду"""
+        n = decoded.pcs.size
         if n == 0:
             return {name: 0.0 for name in self.feature_names_}
 
-        # Частотный счётчик мнемоник
-        mnemonic_counter = Counter(instr.mnemonic for instr in instructions)
+        # Частоты по опкодам (256) и по мнемоникам; все неизвестные опкоды — это INVALID
+        opcode_counts = np.bincount(decoded.opcodes, minlength=256)
+        mnemonic_counts = opcode_counts @ OPCODE_MNEMONIC_MATRIX
+        counts = mnemonic_counts.tolist()
 
-        # Списки для быстрых проверок
-        block_dependent = {"TIMESTAMP", "NUMBER", "DIFFICULTY", "GASLIMIT", "COINBASE", "BLOCKHASH"}
-        call_ops = {"CALL", "DELEGATECALL", "STATICCALL", "CALLCODE"}
-        arithmetic_ops = {"ADD", "SUB", "MUL", "DIV", "MOD", "SDIV", "SMOD", "EXP", "SIGNEXTEND"}
-        dangerous_ops = block_dependent.union(call_ops).union(arithmetic_ops).union({"SELFDESTRUCT"})
-        randomness_ops = {"BLOCKHASH", "TIMESTAMP", "DIFFICULTY", "COINBASE"}
+        def count(*ops):
+            return sum(counts[MNEMONIC_IDS[op]] for op in ops)
 
         # Базовые агрегаты
         total_instructions = n
-        unique_instructions = len(mnemonic_counter)
-
-        block_dependent_count = sum(mnemonic_counter.get(op, 0) for op in block_dependent)
-
-        environmental_count = sum(1 for instr in instructions if getattr(instr, "group", None) == "Environmental Information")
-        unique_env_ops = len({instr.mnemonic for instr in instructions if getattr(instr, "group", None) == "Environmental Information"})
+        unique_instructions = int(np.count_nonzero(mnemonic_counts))
 
-        balance_ops = mnemonic_counter.get("BALANCE", 0)
-        caller_ops = mnemonic_counter.get("CALLER", 0)
-        origin_ops = mnemonic_counter.get("ORIGIN", 0)
-        callvalue_ops = mnemonic_counter.get("CALLVALUE", 0)
+        block_dependent_count = count(*_BLOCK_DEPENDENT)
 
-        calldata_size = mnemonic_counter.get("CALLDATASIZE", 0)
-        calldata_load = mnemonic_counter.get("CALLDATALOAD", 0)
-        calldata_copy = mnemonic_counter.get("CALLDATACOPY", 0)
+        env_mask = (OPCODE_GROUP == ENVIRONMENTAL_GROUP) & (opcode_counts > 0)
+        environmental_count = int(opcode_counts[env_mask].sum())
+        unique_env_ops = int(np.unique(OPCODE_MNEMONIC[env_mask]).size)
 
-        external_call_count = sum(mnemonic_counter.get(op, 0) for op in call_ops)
-        gas_ops = mnemonic_counter.get("GAS", 0)  # часто перед CALL
+        balance_ops = count("BALANCE")
+        caller_ops = count("CALLER")
+        origin_ops = count("ORIGIN")
+        callvalue_ops = count("CALLVALUE")
 
-        # Агрегаты по атрибутам инструкций
-        pushes = sum(getattr(instr, "pushes", 0) for instr in instructions)
-        pops = sum(getattr(instr, "pops", 0) for instr in instructions)
-        fees = [getattr(instr, "fee", 0) for instr in instructions]
+        calldata_size = count("CALLDATASIZE")
+        calldata_load = count("CALLDATALOAD")
+        calldata_copy = count("CALLDATACOPY")
 
-        total_gas = sum(fees)
-        avg_gas = total_gas / n if n else 0
-        max_gas = max(fees) if fees else 0
-        high_gas_count = sum(f > 1000 for f in fees)
+        external_call_count = count(*_CALL_OPS)
+        gas_ops = count("GAS")  # часто перед CALL
 
-        # Простые паттерны на основе PC (с оговоркой: не идеально из-за JUMP, но как эвристика)
-        arithmetic_ops_set = {"ADD", "SUB", "MUL", "DIV", "MOD", "SDIV", "SMOD", "EXP", "SIGNEXTEND"}
-        target_mnemonics = {"SSTORE", "CALL", "DELEGATECALL", "STATICCALL", "CALLCODE", "BALANCE", "JUMPI"} | arithmetic_ops_set
+        # Агрегаты по атрибутам инструкций через таблицы опкодов
+        pushes = int(opcode_counts @ OPCODE_PUSHES)
+        pops = int(opcode_counts @ OPCODE_POPS)
 
-        # Только те, что есть в контракте
-        target_mnemonics = target_mnemonics & mnemonic_counter.keys()
+        total_gas = int(opcode_counts @ OPCODE_FEE)
+        avg_gas = total_gas / n
+        max_gas = int(OPCODE_FEE[opcode_counts > 0].max())
+        high_gas_count = int(opcode_counts[OPCODE_FEE > 1000].sum())
 
-        pcs = {
-            mnemonic: sorted(instr.pc for instr in instructions if instr.mnemonic == mnemonic)
-            for mnemonic in target_mnemonics
-        }
+        patterns = dict(zip(_PATTERN_NAMES, self._detect_patterns(decoded)))
+        potential_reentrancy = patterns["potential_reentrancy_pattern"]
+        unsafe_arith = patterns["unsafe_arithmetic_pattern"]
+        balance_before_call = patterns["balance_before_external_call"]
 
-        potential_reentrancy = 0
-        if "SSTORE" in pcs and any(op in pcs for op in call_ops):
-            for s_pc in pcs["SSTORE"]:
-                for c_op in call_ops:
-                    for c_pc in pcs.get(c_op, []):
-                        if c_pc > s_pc and (c_pc - s_pc) < 20:
-                            potential_reentrancy = 1
-                            break
-
-        unsafe_arith = 0
-        jumpi_pcs = pcs.get("JUMPI", [])
-        for op in arithmetic_ops:
-            for a_pc in pcs.get(op, []):
-                for j_pc in jumpi_pcs:
-                    if j_pc > a_pc and (j_pc - a_pc) < 5:
-                        unsafe_arith = 1
-                        break
-
-        balance_before_call = 0
-        balance_pcs = pcs.get("BALANCE", [])
-        if balance_pcs:
-            for b_pc in balance_pcs:
-                for c_op in call_ops:
-                    for c_pc in pcs.get(c_op, []):
-                        if c_pc > b_pc and (c_pc - b_pc) < 10:
-                            balance_before_call = 1
-                            break
+        # Энтропия по частотам мнемоник в порядке первого появления (как у Counter)
+        present_ids, first_seen = np.unique(decoded.mnemonic_ids, return_index=True)
+        entropy_counts = mnemonic_counts[present_ids[np.argsort(first_seen)]].tolist()
 
         # Собираем словарь признаков
         features = {
@@ -175,13 +195,13 @@ class EVMBytecodeFeatureExtractor(BaseEstimator, TransformerMixin):
             "unique_instructions": unique_instructions,
             "block_dependent_count": block_dependent_count,
             "block_dependency_index": block_dependent_count / total_instructions,
-            **{f"has_{op}": int(op in mnemonic_counter) for op in block_dependent},
+            **{f"has_{op}": int(count(op) > 0) for op in _BLOCK_DEPENDENT},
             "environmental_instructions_count": environmental_count,
             "environmental_ratio": environmental_count / total_instructions,
             "unique_environmental_ops": unique_env_ops,
             "environmental_complexity": unique_env_ops * (environmental_count / total_instructions),
             "balance_operations": balance_ops,
-            "address_operations": mnemonic_counter.get("ADDRESS", 0),
+            "address_operations": count("ADDRESS"),
             "caller_operations": caller_ops,
             "origin_operations": origin_ops,
             "callvalue_operations": callvalue_ops,
@@ -195,7 +215,6 @@ class EVMBytecodeFeatureExtractor(BaseEstimator, TransformerMixin):
             "has_external_calls": int(external_call_count > 0),
             "call_value_ops": callvalue_ops,
             "call_gas_limit_ops": gas_ops,
-            "potential_reentrancy_pattern": potential_reentrancy,
             "pushes": pushes,
             "pops": pops,
             "stack_imbalance": pushes - pops,
@@ -206,23 +225,22 @@ class EVMBytecodeFeatureExtractor(BaseEstimator, TransformerMixin):
             "max_gas_instruction": max_gas,
             "high_gas_instructions": high_gas_count,
             "gas_dos_risk_index": high_gas_count / total_instructions,
-            "arithmetic_ops_count": sum(mnemonic_counter.get(op, 0) for op in arithmetic_ops),
-            "arithmetic_density": sum(mnemonic_counter.get(op, 0) for op in arithmetic_ops) / total_instructions,
-            "unsafe_arithmetic_pattern": unsafe_arith,
-            "control_flow_ops": sum(mnemonic_counter.get(op, 0) for op in {"JUMP", "JUMPI", "RETURN", "REVERT", "STOP", "INVALID"}),
-            "jumpi_count": mnemonic_counter.get("JUMPI", 0),
-            "conditional_branching_ratio": mnemonic_counter.get("JUMPI", 0) / max(1, sum(mnemonic_counter.get(op, 0) for op in {"JUMP", "JUMPI"})),
-            "control_flow_complexity": mnemonic_counter.get("JUMPI", 0) ** 2 / total_instructions,
+            "arithmetic_ops_count": count(*_ARITHMETIC_OPS),
+            "arithmetic_density": count(*_ARITHMETIC_OPS) / total_instructions,
+            "control_flow_ops": count(*_CONTROL_FLOW_OPS),
+            "jumpi_count": count("JUMPI"),
+            "conditional_branching_ratio": count("JUMPI") / max(1, count("JUMP", "JUMPI")),
+            "control_flow_complexity": count("JUMPI") ** 2 / total_instructions,
             "caller_based_checks": caller_ops,
             "origin_usage": origin_ops,
             "access_control_ratio": caller_ops / max(1, external_call_count),
             "uses_origin_instead_caller": int(origin_ops > caller_ops),
-            "balance_before_external_call": balance_before_call,
-            "randomness_ops_count": sum(mnemonic_counter.get(op, 0) for op in randomness_ops),
-            "has_bad_randomness_pattern": int(sum(mnemonic_counter.get(op, 0) for op in randomness_ops) > 0),
-            "dangerous_ops_count": sum(mnemonic_counter.get(op, 0) for op in dangerous_ops),
-            "dangerous_ops_density": sum(mnemonic_counter.get(op, 0) for op in dangerous_ops) / total_instructions,
-            "opcode_entropy": entropy(list(mnemonic_counter.values())) if len(mnemonic_counter) > 1 else 0.0,
+            "randomness_ops_count": count(*_RANDOMNESS_OPS),
+            "has_bad_randomness_pattern": int(count(*_RANDOMNESS_OPS) > 0),
+            "dangerous_ops_count": count(*_DANGEROUS_OPS),
+            "dangerous_ops_density": count(*_DANGEROUS_OPS) / total_instructions,
+            "opcode_entropy": entropy(entropy_counts) if unique_instructions > 1 else 0.0,
+            **patterns,
         }
 
         # Композитные скоринги
@@ -276,6 +294,159 @@ class EVMBytecodeFeatureExtractor(BaseEstimator, TransformerMixin):
     def fit(self, X, y=None):
         return self
 
+    def _count_batch(self, bytecodes) -> tuple:
+        """Один проход по контрактам: матрица частот опкодов (n × 256) и PC-паттерны (n × 3)"""
+        opcode_counts = np.zeros((len(bytecodes), 256), dtype=np.int64)
+        patterns = np.zeros((len(bytecodes), len(_PC_PATTERNS)), dtype=np.int64)
+        for row, bytecode in enumerate(bytecodes):
+            decoded = decode(to_bytes(bytecode))
+            if decoded.pcs.size == 0:
+                continue
+            opcode_counts[row] = np.bincount(decoded.opcodes, minlength=256)
+            patterns[row] = self._detect_patterns(decoded)
+        return opcode_counts, patterns
+
+    def _features_from_counts(self, opcode_counts, patterns) -> dict:
+        """Все признаки колоночными NumPy-операциями над матрицей частот"""
+        mnemonic_counts = opcode_counts @ OPCODE_MNEMONIC_MATRIX
+
+        def count(*ops):
+            return mnemonic_counts[:, [MNEMONIC_IDS[op] for op in ops]].sum(axis=1)
+
+        total = opcode_counts.sum(axis=1)
+        empty = total == 0
+        n = np.where(empty, 1, total)
+
+        unique_instructions = np.count_nonzero(mnemonic_counts, axis=1)
+        block_dependent_count = count(*_BLOCK_DEPENDENT)
+
+        env_columns = OPCODE_GROUP == ENVIRONMENTAL_GROUP
+        environmental_count = opcode_counts[:, env_columns].sum(axis=1)
+        unique_env_ops = np.count_nonzero(
+            (opcode_counts[:, env_columns] > 0).astype(np.int64) @ OPCODE_MNEMONIC_MATRIX[env_columns],
+            axis=1,
+        )
+
+        balance_ops = count("BALANCE")
+        caller_ops = count("CALLER")
+        origin_ops = count("ORIGIN")
+        callvalue_ops = count("CALLVALUE")
+        calldata_size = count("CALLDATASIZE")
+        calldata_load = count("CALLDATALOAD")
+        calldata_copy = count("CALLDATACOPY")
+        total_calldata = calldata_size + calldata_load + calldata_copy
+        external_call_count = count(*_CALL_OPS)
+        jumpi_count = count("JUMPI")
+        arithmetic_count = count(*_ARITHMETIC_OPS)
+        randomness_count = count(*_RANDOMNESS_OPS)
+        dangerous_count = count(*_DANGEROUS_OPS)
+
+        # Суммы газа и стека — скалярные произведения на столбцы таблицы опкодов
+        pushes = opcode_counts @ OPCODE_PUSHES
+        pops = opcode_counts @ OPCODE_POPS
+        total_gas = opcode_counts @ OPCODE_FEE
+        max_gas = np.where(opcode_counts > 0, OPCODE_FEE, 0).max(axis=1)
+        high_gas_count = opcode_counts[:, OPCODE_FEE > 1000].sum(axis=1)
+
+        patterns = dict(zip(_PATTERN_NAMES, patterns.T))
+        potential_reentrancy = patterns["potential_reentrancy_pattern"]
+        unsafe_arith = patterns["unsafe_arithmetic_pattern"]
+        balance_before_call = patterns["balance_before_external_call"]
+
+        external_dependency_index = (block_dependent_count + balance_ops) / n
+        stack_underflow_risk = (pushes - pops < 0).astype(np.int64)
+        gas_dos_risk_index = high_gas_count / n
+        control_flow_complexity = jumpi_count ** 2 / n
+        access_control_ratio = caller_ops / np.maximum(1, external_call_count)
+        has_bad_randomness = (randomness_count > 0).astype(np.int64)
+        dangerous_density = dangerous_count / n
+
+        probabilities = mnemonic_counts / n[:, None]
+        opcode_entropy = np.where(unique_instructions > 1, entr(probabilities).sum(axis=1), 0.0)
+
+        features = {
+            "total_instructions": total,
+            "unique_instructions": unique_instructions,
+            "block_dependent_count": block_dependent_count,
+            "block_dependency_index": block_dependent_count / n,
+            **{f"has_{op}": (count(op) > 0).astype(np.int64) for op in _BLOCK_DEPENDENT},
+            "environmental_instructions_count": environmental_count,
+            "environmental_ratio": environmental_count / n,
+            "unique_environmental_ops": unique_env_ops,
+            "environmental_complexity": unique_env_ops * (environmental_count / n),
+            "balance_operations": balance_ops,
+            "address_operations": count("ADDRESS"),
+            "caller_operations": caller_ops,
+            "origin_operations": origin_ops,
+            "callvalue_operations": callvalue_ops,
+            "external_dependency_index": external_dependency_index,
+            "calldata_size_ops": calldata_size,
+            "calldata_load_ops": calldata_load,
+            "calldata_copy_ops": calldata_copy,
+            "total_calldata_ops": total_calldata,
+            "calldata_density": total_calldata / n,
+            "external_call_count": external_call_count,
+            "has_external_calls": (external_call_count > 0).astype(np.int64),
+            "call_value_ops": callvalue_ops,
+            "call_gas_limit_ops": count("GAS"),
+            "pushes": pushes,
+            "pops": pops,
+            "stack_imbalance": pushes - pops,
+            "stack_operations_ratio": pops / np.maximum(1, pushes),
+            "stack_underflow_risk": stack_underflow_risk,
+            "total_gas_cost": total_gas,
+            "avg_gas_per_instruction": total_gas / n,
+            "max_gas_instruction": max_gas,
+            "high_gas_instructions": high_gas_count,
+            "gas_dos_risk_index": gas_dos_risk_index,
+            "arithmetic_ops_count": arithmetic_count,
+            "arithmetic_density": arithmetic_count / n,
+            "control_flow_ops": count(*_CONTROL_FLOW_OPS),
+            "jumpi_count": jumpi_count,
+            "conditional_branching_ratio": jumpi_count / np.maximum(1, count("JUMP", "JUMPI")),
+            "control_flow_complexity": control_flow_complexity,
+            "caller_based_checks": caller_ops,
+            "origin_usage": origin_ops,
+            "access_control_ratio": access_control_ratio,
+            "uses_origin_instead_caller": (origin_ops > caller_ops).astype(np.int64),
+            "randomness_ops_count": randomness_count,
+            "has_bad_randomness_pattern": has_bad_randomness,
+            "dangerous_ops_count": dangerous_count,
+            "dangerous_ops_density": dangerous_density,
+            "opcode_entropy": opcode_entropy,
+            **patterns,
+        }
+
+        # Композитные скоринги
+        reentrancy_score = (external_call_count + callvalue_ops + potential_reentrancy + balance_before_call) / n
+        frontrunning_score = (block_dependent_count + external_dependency_index + has_bad_randomness) / n
+        dos_score = (gas_dos_risk_index + high_gas_count + control_flow_complexity + stack_underflow_risk) / n
+        arith_score = (arithmetic_count + unsafe_arith + stack_underflow_risk) / n
+        overall_score = np.stack([
+            reentrancy_score, frontrunning_score, dos_score, arith_score,
+            dangerous_density, external_dependency_index,
+        ], axis=1).mean(axis=1)
+
+        features.update({
+            "reentrancy_risk_score": reentrancy_score,
+            "frontrunning_risk_score": frontrunning_score,
+            "dos_risk_score": dos_score,
+            "arithmetic_risk_score": arith_score,
+            "overall_security_risk_score": overall_score,
+            "has_reentrancy_indicators": (reentrancy_score > 0.1).astype(np.int64),
+            "has_unchecked_external_calls": (external_call_count > jumpi_count).astype(np.int64),
+            "has_arithmetic_vulnerabilities": (unsafe_arith > 0).astype(np.int64),
+            "has_access_control_issues": ((access_control_ratio < 0.2) & (external_call_count > 0)).astype(np.int64),
+            "has_dos_vulnerabilities": (gas_dos_risk_index > 0.1).astype(np.int64),
+        })
+
+        # Недостающие признаки и пустой байткод дают 0.0, как в построчном режиме
+        zeros = np.zeros(len(total))
+        columns = {name: features.get(name, zeros) for name in self.feature_names_}
+        if empty.any():
+            columns = {name: np.where(empty, 0.0, values) for name, values in columns.items()}
+        return columns
+
     def transform(self, X):
         if isinstance(X, pd.DataFrame):
             bytecodes = X[self.bytecode_column].values
@@ -286,11 +457,22 @@ class EVMBytecodeFeatureExtractor(BaseEstimator, TransformerMixin):
 
         n_jobs = self.n_workers or max(1, mp.cpu_count() - 1)
 
-        results = Parallel(n_jobs=n_jobs)(
-            delayed(self._extract_features_single)(bc) for bc in bytecodes
+        # Воркеры получают чанки контрактов, а не по одному контракту на задачу
+        if n_jobs == 1 or len(bytecodes) < 2:
+            opcode_counts, patterns = self._count_batch(bytecodes)
+        else:
+            chunks = np.array_split(np.asarray(bytecodes, dtype=object), min(n_jobs, len(bytecodes)))
+            results = Parallel(n_jobs=n_jobs)(
+                delayed(self._count_batch)(chunk) for chunk in chunks
+            )
+            opcode_counts = np.concatenate([counts for counts, _ in results])
+            patterns = np.concatenate([flags for _, flags in results])
+
+        return pd.DataFrame(
+            self._features_from_counts(opcode_counts, patterns),
+            columns=self.feature_names_,
+            index=index,
         )
 
-        return pd.DataFrame(results, columns=self.feature_names_, index=index)
-
     def get_feature_names_out(self, input_features=None):
         return np.array(self.feature_names_, dtype=object)
\ No newline at end of file
@@ -1,4 +1,9 @@
+from app.models.bytecode_blob import BytecodeBlob
 from app.models.contract import Contract, ContractMetadata
 from app.models.request_history import RequestHistory
+from app.models.request_profile import RequestProfile
+from app.models.request_rollup import RequestRollup
+from app.models.retention_policy import RetentionPolicy
+from app.models.stats_sketch import StatsSketch
 
-__all__ = ["Contract", "ContractMetadata", "RequestHistory"]
+__all__ = ["BytecodeBlob", "Contract", "ContractMetadata", "RequestHistory", "RequestProfile", "RequestRollup", "RetentionPolicy", "StatsSketch"]
@@ -1,15 +1,31 @@
 from datetime import datetime
 from typing import Any, Optional
 
+from sqlalchemy import Index, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
 
 
 class RequestHistory(Base):
-    """Model for storing request history."""
+    """Model for storing request history.
+
+    On PostgreSQL the table is range-partitioned by ``timestamp`` into daily
+    partitions, managed by the migrations and the history retention job. The
+    partitioned table's primary key has to include ``timestamp``, so the
+    migration declares it as ``(id, timestamp)``; the model keeps ``id`` alone,
+    which the sequence already makes unique, so SQLite can autoincrement it.
+
+    Rows do not copy the request payload: they point at the scored bytecode in
+    ``bytecode_blobs`` by ``bytecode_hash`` and keep the ``prediction``;
+    ``response_data`` only holds error details.
+    """
 
     __tablename__ = "request_history"
+    __table_args__ = (
+        Index("ix_request_history_timestamp_id", "timestamp", "id"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, nullable=False)
@@ -18,4 +34,7 @@ class RequestHistory(Base):
     response_data: Mapped[Optional[dict[str, Any]]]
     processing_time_ms: Mapped[Optional[int]]
     bytecode_length: Mapped[Optional[int]]
+    bytecode_hash: Mapped[Optional[str]] = mapped_column(String(64))
+    prediction: Mapped[Optional[int]]
+    stage_timings_ms: Mapped[Optional[dict[str, Any]]]
     timestamp: Mapped[datetime] = mapped_column(default=datetime.utcnow, nullable=False)
@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class RequestProfile(Base):
+    """Sampled call stacks of one profiled /forward request."""
+
+    __tablename__ = "request_profiles"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, nullable=False, index=True)
+    bytecode_hash: Mapped[Optional[str]] = mapped_column(String(64))
+    interval_ms: Mapped[float]
+    duration_ms: Mapped[float]
+    sample_count: Mapped[int]
+    stacks: Mapped[dict[str, Any]]
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class RequestRollup(Base):
+    """Per-minute / per-hour aggregates of request_history, one row per response status."""
+
+    __tablename__ = "request_rollups"
+
+    bucket: Mapped[str] = mapped_column(String(8), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(primary_key=True)
+    response_status: Mapped[str] = mapped_column(String(32), primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    processing_time_sum: Mapped[Optional[int]] = mapped_column(BigInteger)
+    processing_time_min: Mapped[Optional[int]]
+    processing_time_max: Mapped[Optional[int]]
+    processing_time_bins: Mapped[dict[str, Any]]
+    bytecode_length_sum: Mapped[Optional[int]] = mapped_column(BigInteger)
+    bytecode_length_min: Mapped[Optional[int]]
+    bytecode_length_max: Mapped[Optional[int]]
@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class RetentionPolicy(Base):
+    """Admin-configured retention window for a time-partitioned table."""
+
+    __tablename__ = "retention_policies"
+
+    table_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    retention_days: Mapped[int] = mapped_column(nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, nullable=False)
@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class StatsSketch(Base):
+    """Persisted quantile sketches backing /stats."""
+
+    __tablename__ = "stats_sketches"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    payload: Mapped[dict[str, Any]]
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, nullable=False)
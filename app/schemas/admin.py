@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+
+
+class RetentionUpdate(BaseModel):
+    """Request model for configuring history retention."""
+
+    retention_days: int = Field(ge=0, description="Days of history to keep; 0 keeps everything")
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class HistoryResponse(BaseModel):
@@ -14,6 +14,12 @@ class HistoryResponse(BaseModel):
     response_data: Optional[Dict[str, Any]] = None
     processing_time_ms: Optional[int] = None
     bytecode_length: Optional[int] = None
+    bytecode_hash: Optional[str] = None
+    prediction: Optional[int] = None
+    bytecode: Optional[str] = Field(
+        default=None, description="Hex bytecode, only with include=bytecode"
+    )
+    stage_timings_ms: Optional[Dict[str, float]] = None
     timestamp: datetime
 
     model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,37 @@
+import zlib
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.bytecode_blob import BytecodeBlob
+
+_COMPRESSION_LEVEL = 6
+
+
+def compress(code: bytes) -> bytes:
+    return zlib.compress(code, _COMPRESSION_LEVEL)
+
+
+def to_hex(data: bytes) -> str:
+    """Decompress a stored blob back to a 0x-prefixed hex string."""
+    return "0x" + zlib.decompress(data).hex()
+
+
+def blob_insert(dialect_name: str, rows: Iterable[Dict[str, Any]]):
+    """INSERT ... ON CONFLICT DO NOTHING for blobs, so each bytecode is stored once."""
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    return dialect.insert(BytecodeBlob).values(list(rows)).on_conflict_do_nothing(
+        index_elements=[BytecodeBlob.hash]
+    )
+
+
+async def load_bytecode(db: AsyncSession, digest: str) -> Optional[str]:
+    """Return the stored bytecode for a hash as hex, or None if unknown.
+
+    The hex is rebuilt from the decoded bytes, so it is lowercase and 0x-prefixed
+    regardless of how the client originally sent it.
+    """
+    data = await db.scalar(select(BytecodeBlob.data).where(BytecodeBlob.hash == digest))
+    return to_hex(data) if data is not None else None
@@ -1,18 +1,39 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import joblib
+import numpy as np
 import pandas as pd
 
+from app.core.config import settings
+from app.features.evm_decoder import decode, to_bytes
 from app.features.evm_extractor import EVMBytecodeFeatureExtractor
+from app.services.metrics import Gauge, forward_stage_duration_seconds, registry
+from app.services.profiler import SamplingProfiler
 
 _MODEL_PATH = (
-    Path(__file__).resolve().parents[1]
+    Path(settings.model_path)
+    if settings.model_path
+    else Path(__file__).resolve().parents[1]
     / "models_artifacts"
     / "num_xgb_model_2025-12-28_14-34.pkl"
 )
+MODEL_VERSION = _MODEL_PATH.stem
 _MODEL = None
+_READINESS: Dict[str, Any] = {"ready": False, "model_version": MODEL_VERSION}
+
+# Small, medium and call-heavy contracts exercise every extractor branch during warm-up
+_WARMUP_BYTECODES = (
+    "0x6080604052348015600f57600080fd5b50603f80601d6000396000f3fe",
+    "0x" + "6001600101" * 200 + "5b57" * 50 + "00",
+    "0x" + "3360005560006000600060003031f1" * 40 + "fe",
+)
 _EXTRACTOR = EVMBytecodeFeatureExtractor(n_workers=1)
+FEATURE_NAMES = tuple(_EXTRACTOR.feature_names_)
 
 
 def _load_model() -> Any:
@@ -22,26 +43,205 @@ def _load_model() -> Any:
     return _MODEL
 
 
+def preload() -> None:
+    """Load the model in a parent process that will fork the serving workers.
+
+    Nothing is predicted here: XGBoost's OpenMP threads must not be started
+    before a fork. Each worker still runs ``warm_up``, which reuses the model.
+    """
+    _load_model()
+
+
+def warm_up() -> Dict[str, Any]:
+    """Load and validate the model, run warm-up predictions and mark the service ready.
+
+    Raises if the artifact is missing or does not match the extractor's features.
+    """
+    start = perf_counter()
+    try:
+        model = _load_model()
+    except FileNotFoundError as exc:
+        raise RuntimeError(f"model artifact not found: {_MODEL_PATH}") from exc
+    model_load_ms = (perf_counter() - start) * 1000
+
+    n_features = getattr(model, "n_features_in_", len(FEATURE_NAMES))
+    if not hasattr(model, "predict") or n_features != len(FEATURE_NAMES):
+        raise RuntimeError(
+            f"model {MODEL_VERSION} expects {n_features} features, extractor produces {len(FEATURE_NAMES)}"
+        )
+
+    start = perf_counter()
+    feature_rows = [predict_with_features(bytecode)[1] for bytecode in _WARMUP_BYTECODES]
+    predict_batch(feature_rows)
+    extract_features_batch(list(_WARMUP_BYTECODES))
+    warmup_ms = (perf_counter() - start) * 1000
+
+    _READINESS.update({
+        "ready": True,
+        "model_version": MODEL_VERSION,
+        "model_path": str(_MODEL_PATH),
+        "model_load_ms": round(model_load_ms, 3),
+        "warmup_ms": round(warmup_ms, 3),
+        "ready_at": datetime.now(timezone.utc).isoformat(),
+    })
+    return dict(_READINESS)
+
+
+def readiness() -> Dict[str, Any]:
+    return dict(_READINESS)
+
+
+def mark_not_ready() -> None:
+    _READINESS["ready"] = False
+
+
 def _to_native(value: Any) -> Any:
     return value.item() if hasattr(value, "item") else value
 
 
+def _feature_matrix(feature_rows: List[Dict[str, Any]]) -> np.ndarray:
+    """Pack feature dicts into the float32 matrix the booster consumes."""
+    matrix = np.empty((len(feature_rows), len(FEATURE_NAMES)), dtype=np.float32)
+    for row, features in zip(matrix, feature_rows):
+        row[:] = [features[name] for name in FEATURE_NAMES]
+    return matrix
+
+
 def extract_features(bytecode: str) -> Dict[str, Any]:
-    features = _EXTRACTOR.transform(pd.DataFrame([{"bytecode": bytecode}]))
-    row = features.iloc[0].to_dict()
-    return {key: _to_native(val) for key, val in row.items()}
+    """Single-row fast path: decoder straight to a native-typed feature dict."""
+    features = _EXTRACTOR._extract_features_single(bytecode)
+    return {name: _to_native(features[name]) for name in FEATURE_NAMES}
+
+
+def extract_features_timed(bytecode: str) -> Tuple[Dict[str, Any], List[Tuple[str, float]]]:
+    """Single-row extraction that also reports (stage, seconds) for each step."""
+    start = perf_counter()
+    code = to_bytes(bytecode)
+    decoded_at = perf_counter()
+    disassembled = decode(code)
+    disassembled_at = perf_counter()
+    features = _EXTRACTOR._features_from_decoded(disassembled)
+    features = {name: _to_native(features[name]) for name in FEATURE_NAMES}
+    finished = perf_counter()
+    return features, [
+        ("hex_decode", decoded_at - start),
+        ("disassemble", disassembled_at - decoded_at),
+        ("features", finished - disassembled_at),
+    ]
+
+
+def extract_features_profiled(
+    bytecode: str,
+    interval_ms: float,
+) -> Tuple[Dict[str, Any], List[Tuple[str, float]], Dict[str, Any]]:
+    """``extract_features_timed`` under the sampling profiler; also returns the profile."""
+    with SamplingProfiler(interval_ms) as profiler:
+        features, stages = extract_features_timed(bytecode)
+    return features, stages, profiler.result()
+
+
+def extract_features_batch(bytecodes: List[Any]) -> List[Dict[str, Any]]:
+    """Batch feature extraction through the vectorized transform."""
+    features = _EXTRACTOR.transform(pd.DataFrame({"bytecode": bytecodes}))
+    return features.to_dict("records")
 
 
 def predict_bytecode_class(bytecode: str) -> Any:
-    model = _load_model()
-    features = _EXTRACTOR.transform(pd.DataFrame([{"bytecode": bytecode}]))
-    prediction = model.predict(features)[0]
-    return _to_native(prediction)
+    return predict_with_features(bytecode)[0]
 
 
 def predict_with_features(bytecode: str) -> Tuple[Any, Dict[str, Any]]:
     model = _load_model()
-    features = _EXTRACTOR.transform(pd.DataFrame([{"bytecode": bytecode}]))
-    prediction = model.predict(features)[0]
-    row = features.iloc[0].to_dict()
-    return _to_native(prediction), {key: _to_native(val) for key, val in row.items()}
+    features = extract_features(bytecode)
+    prediction = model.predict(_feature_matrix([features]))[0]
+    return _to_native(prediction), features
+
+
+def predict_batch(feature_rows: List[Dict[str, Any]]) -> List[Any]:
+    """Run one 2-D predict over already extracted feature dicts."""
+    model = _load_model()
+    predictions = model.predict(_feature_matrix(feature_rows))
+    return [_to_native(value) for value in predictions]
+
+
+class PredictionBatcher:
+    """Coalesces concurrent single-row predictions into one model.predict call.
+
+    A batch is flushed when it reaches ``max_batch_size`` items or when the
+    oldest item has waited ``max_wait_ms``; each caller awaits its own future.
+    """
+
+    def __init__(self, max_batch_size: int, max_wait_ms: float) -> None:
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max_wait_ms
+        self.batch_sizes: Counter = Counter()
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def predict(self, features: Dict[str, Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((features, future))
+        if len(self._pending) >= self.max_batch_size or self.max_wait_ms <= 0:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        self.batch_sizes[len(batch)] += 1
+        start = perf_counter()
+        try:
+            predictions = await asyncio.to_thread(predict_batch, [features for features, _ in batch])
+            # One observation per batch; /forward's own "predict" stage includes the wait for it
+            forward_stage_duration_seconds.observe(perf_counter() - start, "predict_batch")
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), prediction in zip(batch, predictions):
+            if not future.done():
+                future.set_result(prediction)
+
+    def stats(self) -> Dict[str, Any]:
+        batches = sum(self.batch_sizes.values())
+        items = sum(size * count for size, count in self.batch_sizes.items())
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": batches,
+            "items": items,
+            "mean_batch_size": items / batches if batches else None,
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+        }
+
+
+registry.register(Gauge(
+    "model_load_seconds",
+    "Time it took to load the model artifact at startup.",
+    callback=lambda: _READINESS.get("model_load_ms", 0.0) / 1000,
+    aggregate="max",
+))
+registry.register(Gauge(
+    "model_ready",
+    "1 once the model is loaded and warmed up, 0 otherwise.",
+    callback=lambda: float(_READINESS["ready"]),
+    aggregate="min",
+))
+
+prediction_batcher = PredictionBatcher(
+    max_batch_size=settings.predict_batch_size,
+    max_wait_ms=settings.predict_batch_wait_ms,
+)
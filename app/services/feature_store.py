@@ -0,0 +1,124 @@
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import LargeBinary, Select, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.contract import Contract, ContractMetadata
+from app.services.evm_inference import FEATURE_NAMES
+
+# Bump whenever FEATURE_NAMES or the vector format changes; vectors of another
+# version are not decoded. 1 was float32, which rounded large gas totals and
+# every ratio, so features read back from the database differed from a fresh
+# extraction
+FEATURE_SCHEMA_VERSION = 2
+
+_VECTOR_DTYPE = np.dtype("<f8")
+_ID_DTYPE = np.dtype(">i8")
+_DEFAULT_CHUNK_SIZE = 50000
+
+# Features that keep a typed column on ContractMetadata next to the vector
+QUERYABLE_FEATURES = tuple(
+    column.name
+    for column in ContractMetadata.__table__.columns
+    if column.name in FEATURE_NAMES
+)
+
+
+def pack_features(features: Dict[str, Any]) -> bytes:
+    """Feature dict -> float64 vector bytes in FEATURE_NAMES order."""
+    return np.fromiter(
+        (features[name] for name in FEATURE_NAMES), dtype=_VECTOR_DTYPE, count=len(FEATURE_NAMES)
+    ).tobytes()
+
+
+def unpack_features(data: bytes) -> Dict[str, float]:
+    """Inverse of ``pack_features``; every feature comes back exactly."""
+    return dict(zip(FEATURE_NAMES, np.frombuffer(data, dtype=_VECTOR_DTYPE).tolist()))
+
+
+def metadata_values(features: Dict[str, Any]) -> Dict[str, Any]:
+    """ContractMetadata row values: the packed vector plus the typed columns."""
+    values: Dict[str, Any] = {
+        "feature_schema_version": FEATURE_SCHEMA_VERSION,
+        "feature_vector": pack_features(features),
+    }
+    for name in QUERYABLE_FEATURES:
+        column_type = ContractMetadata.__table__.c[name].type.python_type
+        values[name] = column_type(features[name])
+    return values
+
+
+def _chunk_query(dialect_name: str, after_id: int, chunk_size: int, model_version: Optional[str]) -> Select:
+    """One row: the chunk's contract ids and vectors, each concatenated into a single value.
+
+    Both aggregates see the rows in the same order, so ids and vectors line up.
+    """
+    rows = (
+        select(ContractMetadata.contract_id, ContractMetadata.feature_vector)
+        .where(
+            ContractMetadata.contract_id > after_id,
+            ContractMetadata.feature_schema_version == FEATURE_SCHEMA_VERSION,
+        )
+        .order_by(ContractMetadata.contract_id)
+        .limit(chunk_size)
+    )
+    if model_version is not None:
+        rows = rows.join(Contract, Contract.id == ContractMetadata.contract_id).where(
+            Contract.model_version == model_version
+        )
+    rows = rows.subquery()
+    if dialect_name == "postgresql":
+        empty = literal(b"", LargeBinary)
+        return select(
+            func.string_agg(func.int8send(rows.c.contract_id), empty),
+            func.string_agg(rows.c.feature_vector, empty),
+        )
+    # SQLite cannot concatenate blobs; hex text is the cheapest lossless detour
+    return select(
+        func.group_concat(func.printf("%016x", rows.c.contract_id), ""),
+        func.group_concat(func.hex(rows.c.feature_vector), ""),
+    )
+
+
+async def iter_feature_chunks(
+    db: AsyncSession,
+    model_version: Optional[str] = None,
+    chunk_size: int = _DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[Tuple[np.ndarray, np.ndarray]]:
+    """Yield ``(contract_ids, features)`` arrays of up to ``chunk_size`` contracts, by contract id.
+
+    The database concatenates each chunk into two values that become NumPy
+    arrays directly, so no Python object is built per row. ``features`` is a
+    float64 matrix with FEATURE_NAMES as columns.
+    """
+    dialect_name = db.bind.dialect.name
+    after_id = 0
+    while True:
+        ids, vectors = (await db.execute(_chunk_query(dialect_name, after_id, chunk_size, model_version))).one()
+        if not ids:
+            return
+        if isinstance(ids, str):
+            ids, vectors = bytes.fromhex(ids), bytes.fromhex(vectors)
+        contract_ids = np.frombuffer(ids, dtype=_ID_DTYPE).astype(np.int64)
+        features = np.frombuffer(vectors, dtype=_VECTOR_DTYPE).reshape(-1, len(FEATURE_NAMES))
+        if (np.diff(contract_ids) < 0).any():
+            order = np.argsort(contract_ids)
+            contract_ids, features = contract_ids[order], features[order]
+        yield contract_ids, features
+        after_id = int(contract_ids.max())
+
+
+async def load_feature_matrix(
+    db: AsyncSession,
+    model_version: Optional[str] = None,
+    chunk_size: int = _DEFAULT_CHUNK_SIZE,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """All stored feature vectors of the current schema as ``(contract_ids, features)``."""
+    id_chunks, feature_chunks = [], []
+    async for contract_ids, features in iter_feature_chunks(db, model_version, chunk_size):
+        id_chunks.append(contract_ids)
+        feature_chunks.append(features)
+    if not id_chunks:
+        return np.empty(0, dtype=np.int64), np.empty((0, len(FEATURE_NAMES)), dtype=_VECTOR_DTYPE)
+    return np.concatenate(id_chunks), np.concatenate(feature_chunks)
@@ -0,0 +1,251 @@
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, engine
+from app.models.request_history import RequestHistory
+from app.models.retention_policy import RetentionPolicy
+from app.services.leader import leader
+from app.services.metrics import Gauge, registry
+
+_TABLE = RequestHistory.__tablename__
+_PARTITION_PREFIX = f"{_TABLE}_p"
+_DEFAULT_PARTITION = f"{_TABLE}_default"
+_COLUMN_NAMES = ", ".join(column.name for column in RequestHistory.__table__.columns)
+
+_LIST_PARTITIONS = text(
+    """
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = :table
+    ORDER BY child.relname
+    """
+)
+
+
+def _day_range(day: date) -> str:
+    return f"FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time())
+
+
+def partition_name(day: date) -> str:
+    return f"{_PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def _partition_day(name: str) -> Optional[date]:
+    if not name.startswith(_PARTITION_PREFIX):
+        return None
+    try:
+        return datetime.strptime(name[len(_PARTITION_PREFIX):], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+class HistoryRetention:
+    """Keeps ``request_history`` within the configured retention window.
+
+    On PostgreSQL the table is partitioned by day: each run pre-creates the next
+    ``premake_days`` partitions and detaches and drops the ones that lie entirely
+    before the cutoff, so expiring a day costs the same however many rows it
+    holds. Rows that landed in the DEFAULT partition (the job fell behind, or a
+    client sent an out-of-range timestamp) are moved into their day's partition
+    when it is created and otherwise expire with a DELETE; the number left there
+    is reported as ``default_rows``. Other backends fall back to a plain DELETE.
+    ``retention_days = 0`` keeps history forever.
+
+    Only the ``leader`` process runs the periodic job, so several workers never
+    create or drop the same partitions at once.
+    """
+
+    def __init__(self, retention_days: int, premake_days: int, interval_s: float) -> None:
+        self.retention_days = retention_days
+        self.premake_days = premake_days
+        self.interval_s = interval_s
+        self.last_run: Optional[datetime] = None
+        self.last_dropped: List[str] = []
+        self.last_error: Optional[str] = None
+        self.default_rows: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        await self._load_policy()
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _load_policy(self) -> None:
+        async with AsyncSessionLocal() as session:
+            policy = await session.get(RetentionPolicy, _TABLE)
+        if policy is not None:
+            self.retention_days = policy.retention_days
+
+    async def set_retention_days(self, retention_days: int) -> None:
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                policy = await session.get(RetentionPolicy, _TABLE)
+                if policy is None:
+                    session.add(RetentionPolicy(table_name=_TABLE, retention_days=retention_days))
+                else:
+                    policy.retention_days = retention_days
+                    policy.updated_at = datetime.utcnow()
+        self.retention_days = retention_days
+
+    def cutoff(self, today: date) -> Optional[date]:
+        """First day that is still retained; earlier days are expired."""
+        if self.retention_days <= 0:
+            return None
+        return today - timedelta(days=self.retention_days - 1)
+
+    async def run_once(self) -> Dict[str, Any]:
+        today = datetime.utcnow().date()
+        cutoff = self.cutoff(today)
+        async with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                await self._create_partitions(conn, today)
+                dropped = await self._drop_partitions(conn, cutoff)
+                self.default_rows = await self._purge_default(conn, cutoff)
+            else:
+                dropped = []
+                if cutoff is not None:
+                    await conn.execute(
+                        delete(RequestHistory).where(
+                            RequestHistory.timestamp < _midnight(cutoff)
+                        )
+                    )
+        self.last_run = datetime.utcnow()
+        self.last_dropped = dropped
+        self.last_error = None
+        return {"cutoff": cutoff, "dropped": dropped, "default_rows": self.default_rows}
+
+    async def _create_partitions(self, conn: AsyncConnection, today: date) -> None:
+        existing = set((await conn.execute(_LIST_PARTITIONS, {"table": _TABLE})).scalars())
+        has_default = _DEFAULT_PARTITION in existing
+        for offset in range(self.premake_days + 1):
+            day = today + timedelta(days=offset)
+            name = partition_name(day)
+            if name in existing:
+                continue
+            if has_default and await self._default_has_day(conn, day):
+                await self._create_from_default(conn, day)
+            else:
+                await conn.execute(
+                    text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {_TABLE} FOR VALUES {_day_range(day)}")
+                )
+
+    async def _default_has_day(self, conn: AsyncConnection, day: date) -> bool:
+        return bool(
+            (
+                await conn.execute(
+                    text(
+                        f"SELECT EXISTS (SELECT 1 FROM {_DEFAULT_PARTITION} "
+                        "WHERE timestamp >= :start AND timestamp < :end)"
+                    ),
+                    {"start": _midnight(day), "end": _midnight(day + timedelta(days=1))},
+                )
+            ).scalar()
+        )
+
+    async def _create_from_default(self, conn: AsyncConnection, day: date) -> None:
+        # PostgreSQL refuses to create a partition whose range already has rows in
+        # DEFAULT, so take DEFAULT out, create the day and move its rows across
+        bounds = {"start": _midnight(day), "end": _midnight(day + timedelta(days=1))}
+        in_day = "WHERE timestamp >= :start AND timestamp < :end"
+        await conn.execute(text(f"ALTER TABLE {_TABLE} DETACH PARTITION {_DEFAULT_PARTITION}"))
+        await conn.execute(text(f"CREATE TABLE {partition_name(day)} PARTITION OF {_TABLE} FOR VALUES {_day_range(day)}"))
+        await conn.execute(
+            text(
+                f"INSERT INTO {_TABLE} ({_COLUMN_NAMES}) "
+                f"SELECT {_COLUMN_NAMES} FROM {_DEFAULT_PARTITION} {in_day}"
+            ),
+            bounds,
+        )
+        await conn.execute(text(f"DELETE FROM {_DEFAULT_PARTITION} {in_day}"), bounds)
+        await conn.execute(text(f"ALTER TABLE {_TABLE} ATTACH PARTITION {_DEFAULT_PARTITION} DEFAULT"))
+
+    async def _drop_partitions(self, conn: AsyncConnection, cutoff: Optional[date]) -> List[str]:
+        if cutoff is None:
+            return []
+        dropped = []
+        for name in (await conn.execute(_LIST_PARTITIONS, {"table": _TABLE})).scalars():
+            day = _partition_day(name)
+            if day is not None and day < cutoff:
+                await conn.execute(text(f"ALTER TABLE {_TABLE} DETACH PARTITION {name}"))
+                await conn.execute(text(f"DROP TABLE {name}"))
+                dropped.append(name)
+        return dropped
+
+    async def _purge_default(self, conn: AsyncConnection, cutoff: Optional[date]) -> Optional[int]:
+        """Expire rows held in DEFAULT and return how many are left there."""
+        existing = (await conn.execute(_LIST_PARTITIONS, {"table": _TABLE})).scalars()
+        if _DEFAULT_PARTITION not in set(existing):
+            return None
+        if cutoff is not None:
+            await conn.execute(
+                text(f"DELETE FROM {_DEFAULT_PARTITION} WHERE timestamp < :cutoff"), {"cutoff": _midnight(cutoff)}
+            )
+        return (await conn.execute(text(f"SELECT count(*) FROM {_DEFAULT_PARTITION}"))).scalar()
+
+    async def partitions(self) -> List[str]:
+        async with engine.connect() as conn:
+            if conn.dialect.name != "postgresql":
+                return []
+            return list((await conn.execute(_LIST_PARTITIONS, {"table": _TABLE})).scalars())
+
+    async def _run(self) -> None:
+        while True:
+            if leader.acquire():
+                try:
+                    # The policy may have been changed through another worker
+                    await self._load_policy()
+                    result = await self.run_once()
+                    if result["dropped"]:
+                        print(f"✓ Dropped expired history partitions: {', '.join(result['dropped'])}")
+                    if result["default_rows"]:
+                        print(f"✗ {result['default_rows']} history rows are in the default partition")
+                except Exception as exc:
+                    self.last_error = f"{type(exc).__name__}: {exc}"
+                    print(f"✗ Error applying history retention: {self.last_error}")
+            await asyncio.sleep(self.interval_s)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "retention_days": self.retention_days,
+            "premake_days": self.premake_days,
+            "interval_s": self.interval_s,
+            "last_run": self.last_run,
+            "last_dropped": self.last_dropped,
+            "last_error": self.last_error,
+            "default_rows": self.default_rows,
+            "leader": leader.is_leader,
+        }
+
+
+history_retention = HistoryRetention(
+    retention_days=settings.history_retention_days,
+    premake_days=settings.history_partition_premake_days,
+    interval_s=settings.history_retention_interval_s,
+)
+
+registry.register(Gauge(
+    "history_default_partition_rows",
+    "Rows in the request_history DEFAULT partition at the last retention run.",
+    callback=lambda: float(history_retention.default_rows or 0),
+    aggregate="max",
+))
@@ -0,0 +1,139 @@
+import asyncio
+import multiprocessing as mp
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.services import evm_inference
+
+
+class InferenceSaturated(Exception):
+    """Raised when the inference queue is full and the request must be shed."""
+
+
+def _init_worker() -> None:
+    """Warm up the extractor in each worker before it takes requests."""
+    evm_inference.extract_features("0x00")
+
+
+class InferenceExecutor:
+    """Runs CPU-bound inference off the event loop with a bounded admission queue.
+
+    Feature extraction runs in the pool; the model call goes through the
+    micro-batcher in this process. At most ``workers`` extractions run at once
+    and at most ``queue_size`` more wait; anything beyond that is rejected
+    immediately. ``workers=0`` extracts in a single thread instead of processes.
+    """
+
+    def __init__(self, workers: int, queue_size: int) -> None:
+        self.workers = workers
+        self.queue_size = queue_size
+        self.submitted = 0
+        self.rejected = 0
+        self._in_flight = 0
+        self._pool: Optional[Executor] = None
+
+    @property
+    def capacity(self) -> int:
+        return max(1, self.workers) + self.queue_size
+
+    def start(self) -> None:
+        if self._pool is not None:
+            return
+        if self.workers > 0:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=mp.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+
+    async def warm_up(self) -> None:
+        """Start every pool worker now instead of on the first requests."""
+        self.start()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self._pool, evm_inference.extract_features, "0x00")
+            for _ in range(max(1, self.workers))
+        ))
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._in_flight >= self.capacity:
+            self.rejected += 1
+            raise InferenceSaturated("inference queue is full")
+        self.start()
+        self._in_flight += 1
+        self.submitted += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, fn, *args)
+        finally:
+            self._in_flight -= 1
+
+    async def predict_with_features(
+        self,
+        bytecode: str,
+        stages: Optional[List[Tuple[str, float]]] = None,
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """Extract in the pool and predict through the batcher; appends stage timings to ``stages``."""
+        features, extract_stages = await self._submit(evm_inference.extract_features_timed, bytecode)
+        prediction = await self._predict(features, extract_stages, stages)
+        return prediction, features
+
+    async def predict_profiled(
+        self,
+        bytecode: str,
+        interval_ms: float,
+        stages: Optional[List[Tuple[str, float]]] = None,
+    ) -> Tuple[Any, Dict[str, Any], Dict[str, Any]]:
+        """``predict_with_features`` with extraction sampled by the profiler in the worker."""
+        features, extract_stages, profile = await self._submit(
+            evm_inference.extract_features_profiled, bytecode, interval_ms
+        )
+        prediction = await self._predict(features, extract_stages, stages)
+        return prediction, features, profile
+
+    async def _predict(
+        self,
+        features: Dict[str, Any],
+        extract_stages: List[Tuple[str, float]],
+        stages: Optional[List[Tuple[str, float]]],
+    ) -> Any:
+        start = perf_counter()
+        prediction = await evm_inference.prediction_batcher.predict(features)
+        if stages is not None:
+            stages.extend(extract_stages)
+            stages.append(("predict", perf_counter() - start))
+        return prediction
+
+    async def predict_chunk(self, bytecodes: Sequence[Any]) -> Tuple[List[Any], List[Dict[str, Any]]]:
+        """Score a chunk with one batch extraction in a worker and one 2-D predict."""
+        feature_rows = await self._submit(evm_inference.extract_features_batch, list(bytecodes))
+        predictions = await asyncio.to_thread(evm_inference.predict_batch, feature_rows)
+        return predictions, feature_rows
+
+    def stats(self) -> Dict[str, Any]:
+        slots = max(1, self.workers)
+        busy = min(self._in_flight, slots)
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "in_flight": self._in_flight,
+            "queue_depth": self._in_flight - busy,
+            "worker_utilization": busy / slots,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+        }
+
+
+inference_executor = InferenceExecutor(
+    workers=settings.inference_workers,
+    queue_size=settings.inference_queue_size,
+)
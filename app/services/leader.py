@@ -0,0 +1,44 @@
+import fcntl
+import os
+from typing import Optional
+
+from app.core.config import settings
+
+
+class LeaderLock:
+    """Picks the one process on this host that runs the singleton background jobs.
+
+    Under gunicorn every worker runs the app lifespan, so jobs that must run
+    once rather than once per worker (history retention, the stats rebuild)
+    call ``acquire`` before each run. The process holding an exclusive
+    ``flock`` on ``path`` is the leader until it exits; the lock is released
+    with its file descriptor and the next worker to ask takes over.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+leader = LeaderLock(settings.leader_lock_path)
@@ -0,0 +1,320 @@
+import asyncio
+import json
+import os
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+# Seconds; fine-grained at the low end so sub-millisecond stages are visible
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def state(self) -> Any:
+        """JSON-serializable current values, for adding up across processes."""
+
+    @abstractmethod
+    def merge_states(self, states: List[Any]) -> Any:
+        """One state combining those of several processes."""
+
+    @abstractmethod
+    def render_state(self, state: Any) -> List[str]:
+        """Exposition lines for a state."""
+
+    def render(self) -> List[str]:
+        return self.render_state(self.state())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def state(self) -> List[Tuple[LabelValues, float]]:
+        with self._lock:
+            return list(self._values.items())
+
+    def merge_states(self, states: List[Any]) -> List[Tuple[LabelValues, float]]:
+        totals: Dict[LabelValues, float] = {}
+        for state in states:
+            for labels, value in state:
+                labels = tuple(labels)
+                totals[labels] = totals.get(labels, 0.0) + value
+        return list(totals.items())
+
+    def render_state(self, state: List[Tuple[LabelValues, float]]) -> List[str]:
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in state
+        ]
+
+
+class Gauge(_Metric):
+    """Gauge set directly or, with ``callback``, read at scrape time.
+
+    ``aggregate`` (``sum``, ``max`` or ``min``) combines the values of the
+    live worker processes.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Optional[Callable[[], float]] = None,
+        aggregate: str = "sum",
+    ) -> None:
+        super().__init__(name, documentation)
+        self._value = 0.0
+        self._callback = callback
+        self.aggregate = aggregate
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def state(self) -> float:
+        return self._callback() if self._callback is not None else self._value
+
+    def merge_states(self, states: List[Any]) -> float:
+        if not states:
+            return 0.0
+        return {"sum": sum, "max": max, "min": min}[self.aggregate](states)
+
+    def render_state(self, state: float) -> List[str]:
+        return self._header() + [f"{self.name} {_format_value(state)}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: non-cumulative bucket counts (last one is +Inf) and the sum
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1][0] += value
+
+    def state(self) -> List[Tuple[LabelValues, List[int], float]]:
+        with self._lock:
+            return [(labels, list(counts), total[0]) for labels, (counts, total) in self._series.items()]
+
+    def merge_states(self, states: List[Any]) -> List[Tuple[LabelValues, List[int], float]]:
+        merged: Dict[LabelValues, Tuple[List[int], float]] = {}
+        for state in states:
+            for labels, counts, total in state:
+                labels = tuple(labels)
+                if labels in merged:
+                    seen, seen_total = merged[labels]
+                    merged[labels] = ([a + b for a, b in zip(seen, counts)], seen_total + total)
+                else:
+                    merged[labels] = (list(counts), total)
+        return [(labels, counts, total) for labels, (counts, total) in merged.items()]
+
+    def render_state(self, state: List[Tuple[LabelValues, List[int], float]]) -> List[str]:
+        lines = self._header()
+        for labels, counts, total in state:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Metrics of this process or, with ``directory``, of all web workers.
+
+    Each gunicorn worker keeps its own metrics, so a scrape that lands on one
+    worker would see counters jump back and forth. With ``directory`` set (see
+    gunicorn.conf.py) every process saves its values to ``<pid>.json`` there
+    every ``dump_interval_s`` and on shutdown, and ``render`` adds up all the
+    files. Files of exited workers are kept, so counters and histograms stay
+    monotonic across worker restarts; gauges only count live workers. Other
+    workers' values are at most ``dump_interval_s`` old.
+    """
+
+    def __init__(self, directory: Optional[str] = None, dump_interval_s: float = 5.0) -> None:
+        self._metrics: List[_Metric] = []
+        self.directory = directory
+        self.dump_interval_s = dump_interval_s
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"{pid}.json")
+
+    @staticmethod
+    def _write(path: str, payload: Dict[str, Any]) -> None:
+        with open(f"{path}.tmp", "w") as handle:
+            json.dump(payload, handle)
+        os.replace(f"{path}.tmp", path)
+
+    def dump(self) -> None:
+        if self.directory is None:
+            return
+        payload = {"live": True, "metrics": {metric.name: metric.state() for metric in self._metrics}}
+        self._write(self._path(os.getpid()), payload)
+
+    def mark_dead(self, pid: int) -> None:
+        """Called by the gunicorn master when a worker exits: keep its counters, drop its gauges."""
+        if self.directory is None:
+            return
+        try:
+            with open(self._path(pid)) as handle:
+                payload = json.load(handle)
+        except (OSError, ValueError):
+            return
+        payload["live"] = False
+        self._write(self._path(pid), payload)
+
+    def _saved(self) -> List[Dict[str, Any]]:
+        payloads = []
+        for entry in os.listdir(self.directory):
+            if not entry.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, entry)) as handle:
+                    payloads.append(json.load(handle))
+            except (OSError, ValueError):
+                continue
+        return payloads
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4."""
+        lines: List[str] = []
+        if self.directory is None:
+            for metric in self._metrics:
+                lines.extend(metric.render())
+            return "\n".join(lines) + "\n"
+        self.dump()
+        payloads = self._saved()
+        for metric in self._metrics:
+            states = [
+                payload["metrics"][metric.name]
+                for payload in payloads
+                if metric.name in payload["metrics"] and (payload["live"] or metric.kind != "gauge")
+            ]
+            lines.extend(metric.render_state(metric.merge_states(states)))
+        return "\n".join(lines) + "\n"
+
+    def start(self) -> None:
+        if self.directory is not None and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self.dump()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.dump_interval_s)
+            try:
+                self.dump()
+            except OSError as exc:
+                print(f"✗ Error saving metrics: {type(exc).__name__}: {exc}")
+
+
+registry = Registry(settings.metrics_dir, settings.metrics_dump_interval_s)
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ("method", "route", "status"),
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method, route template and status code.",
+    ("method", "route", "status"),
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served.",
+))
+forward_stage_duration_seconds = registry.register(Histogram(
+    "forward_stage_duration_seconds",
+    "Time spent in each stage of scoring a contract.",
+    ("stage",),
+))
+
+
+def observe_stages(stages: Iterable[Tuple[str, float]]) -> None:
+    """Record ``(stage, seconds)`` pairs in the per-stage histogram."""
+    for stage, seconds in stages:
+        forward_stage_duration_seconds.observe(seconds, stage)
@@ -0,0 +1,65 @@
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+from app.features.evm_decoder import to_bytes
+
+CachedPrediction = Tuple[Any, Dict[str, Any]]
+
+
+def bytecode_hash(bytecode: Any) -> str:
+    """SHA-256 of the normalized bytecode bytes (same input the extractor sees)."""
+    return hashlib.sha256(to_bytes(bytecode)).hexdigest()
+
+
+class PredictionCache:
+    """Bounded in-process LRU of (prediction, features) keyed by (model version, bytecode hash)."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.db_hits = 0
+        self._items: "OrderedDict[Hashable, CachedPrediction]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[CachedPrediction]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: CachedPrediction) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def record_db_hit(self) -> None:
+        """Count an LRU miss that was then served from the contracts table."""
+        with self._lock:
+            self.db_hits += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else None,
+            }
+
+
+prediction_cache = PredictionCache(settings.prediction_cache_size)
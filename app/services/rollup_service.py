@@ -0,0 +1,234 @@
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.request_rollup import RequestRollup
+
+ROLLUP_BUCKETS: Dict[str, timedelta] = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+}
+
+# Upper edges of the processing-time histogram bins; larger values land in "inf"
+LATENCY_BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+_BIN_KEYS = tuple(str(bound) for bound in LATENCY_BOUNDS_MS) + ("inf",)
+
+RollupKey = Tuple[str, datetime, str]
+
+
+def bucket_start(timestamp: datetime, bucket: str) -> datetime:
+    if bucket == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def _latency_bin(processing_time_ms: int) -> str:
+    return _BIN_KEYS[bisect_left(LATENCY_BOUNDS_MS, processing_time_ms)]
+
+
+def _empty_rollup() -> Dict[str, Any]:
+    return {
+        "count": 0,
+        "processing_time_sum": None,
+        "processing_time_min": None,
+        "processing_time_max": None,
+        "processing_time_bins": {},
+        "bytecode_length_sum": None,
+        "bytecode_length_min": None,
+        "bytecode_length_max": None,
+    }
+
+
+def _add_range(values: Dict[str, Any], prefix: str, total: int, low: int, high: int) -> None:
+    """Fold an aggregated sum/min/max into the ``prefix`` columns."""
+    current = values[f"{prefix}_sum"]
+    values[f"{prefix}_sum"] = total if current is None else current + total
+    current = values[f"{prefix}_min"]
+    values[f"{prefix}_min"] = low if current is None else min(current, low)
+    current = values[f"{prefix}_max"]
+    values[f"{prefix}_max"] = high if current is None else max(current, high)
+
+
+def _merge_rollup(values: Dict[str, Any], other: Dict[str, Any]) -> None:
+    values["count"] += other["count"]
+    for prefix in ("processing_time", "bytecode_length"):
+        if other[f"{prefix}_sum"] is not None:
+            _add_range(
+                values,
+                prefix,
+                other[f"{prefix}_sum"],
+                other[f"{prefix}_min"],
+                other[f"{prefix}_max"],
+            )
+    values["processing_time_bins"] = _merge_bins(values["processing_time_bins"], other["processing_time_bins"])
+
+
+def _merge_bins(bins: Dict[str, int], other: Dict[str, int]) -> Dict[str, int]:
+    merged = dict(bins)
+    for key, count in other.items():
+        merged[key] = merged.get(key, 0) + count
+    return merged
+
+
+def aggregate(histories: Iterable[Dict[str, Any]]) -> Dict[RollupKey, Dict[str, Any]]:
+    """Aggregate history rows into rollup values keyed by (bucket, bucket_start, status)."""
+    rollups: Dict[RollupKey, Dict[str, Any]] = {}
+    for row in histories:
+        status = row.get("response_status") or "unknown"
+        processing_time_ms = row.get("processing_time_ms")
+        for bucket in ROLLUP_BUCKETS:
+            key = (bucket, bucket_start(row["timestamp"], bucket), status)
+            values = rollups.get(key)
+            if values is None:
+                values = rollups[key] = _empty_rollup()
+            values["count"] += 1
+            bytecode_length = row.get("bytecode_length")
+            if bytecode_length is not None:
+                _add_range(values, "bytecode_length", bytecode_length, bytecode_length, bytecode_length)
+            if processing_time_ms is not None:
+                _add_range(values, "processing_time", processing_time_ms, processing_time_ms, processing_time_ms)
+                bins = values["processing_time_bins"]
+                bin_key = _latency_bin(processing_time_ms)
+                bins[bin_key] = bins.get(bin_key, 0) + 1
+    return rollups
+
+
+def _rollup_upsert(dialect_name: str, rows: List[Dict[str, Any]]):
+    """INSERT ... ON CONFLICT DO UPDATE that adds counts and sums and keeps min/max.
+
+    Several workers may flush into the same new bucket at once, so the row is
+    inserted or folded into atomically. The JSON bins cannot be added up in
+    SQL on every backend; the existing row keeps its bins and the statement
+    returns them, with the merged count, for ``apply_rollups`` to finish.
+    """
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    statement = dialect.insert(RequestRollup).values(rows)
+    current, excluded = RequestRollup.__table__.c, statement.excluded
+    set_ = {"count": current["count"] + excluded["count"]}
+    for prefix in ("processing_time", "bytecode_length"):
+        total, low, high = f"{prefix}_sum", f"{prefix}_min", f"{prefix}_max"
+        # Either side may be NULL when no row in it had the value
+        set_[total] = func.coalesce(current[total] + excluded[total], current[total], excluded[total])
+        set_[low] = case(
+            (excluded[low] < current[low], excluded[low]),
+            else_=func.coalesce(current[low], excluded[low]),
+        )
+        set_[high] = case(
+            (excluded[high] > current[high], excluded[high]),
+            else_=func.coalesce(current[high], excluded[high]),
+        )
+    return statement.on_conflict_do_update(
+        index_elements=[RequestRollup.bucket, RequestRollup.bucket_start, RequestRollup.response_status],
+        set_=set_,
+    ).returning(
+        RequestRollup.bucket,
+        RequestRollup.bucket_start,
+        RequestRollup.response_status,
+        RequestRollup.count,
+        RequestRollup.processing_time_bins,
+    )
+
+
+async def apply_rollups(session: AsyncSession, histories: List[Dict[str, Any]]) -> None:
+    """Fold freshly inserted history rows into the rollup tables inside the caller's transaction."""
+    rollups = aggregate(histories)
+    if not rollups:
+        return
+    # A fixed key order keeps concurrent upserts from locking rows in opposite orders
+    rows = [
+        {"bucket": bucket, "bucket_start": start, "response_status": status, **values}
+        for (bucket, start, status), values in sorted(rollups.items())
+    ]
+    result = await session.execute(_rollup_upsert(session.bind.dialect.name, rows))
+    for bucket, start, status, count, bins in result.all():
+        values = rollups[(bucket, start, status)]
+        if count == values["count"]:
+            # Freshly inserted, bins included
+            continue
+        await session.execute(
+            update(RequestRollup)
+            .where(
+                RequestRollup.bucket == bucket,
+                RequestRollup.bucket_start == start,
+                RequestRollup.response_status == status,
+            )
+            .values(processing_time_bins=_merge_bins(bins, values["processing_time_bins"]))
+        )
+
+
+def _bin_quantile(values: Dict[str, Any], q: float) -> Optional[float]:
+    """Upper edge of the histogram bin holding the nearest-rank quantile, clamped to the observed max."""
+    bins = values["processing_time_bins"]
+    total = sum(bins.values())
+    if not total:
+        return None
+    rank = int(round(q * (total - 1)))
+    seen = 0
+    for key in _BIN_KEYS:
+        seen += bins.get(key, 0)
+        if seen > rank:
+            high = values["processing_time_max"]
+            return float(high if key == "inf" else min(int(key), high))
+    return float(values["processing_time_max"])
+
+
+def _point(values: Dict[str, Any], status_counts: Dict[str, int]) -> Dict[str, Any]:
+    def summary(prefix: str) -> Dict[str, Optional[float]]:
+        total = values[f"{prefix}_sum"]
+        count = sum(values["processing_time_bins"].values()) if prefix == "processing_time" else values["count"]
+        return {
+            "mean": total / count if total is not None and count else None,
+            "min": values[f"{prefix}_min"],
+            "max": values[f"{prefix}_max"],
+        }
+
+    processing_time = summary("processing_time")
+    processing_time.update(
+        p50=_bin_quantile(values, 0.50),
+        p95=_bin_quantile(values, 0.95),
+        p99=_bin_quantile(values, 0.99),
+    )
+    return {
+        "count": values["count"],
+        "status_counts": status_counts,
+        "processing_time_ms": processing_time,
+        "bytecode_length": summary("bytecode_length"),
+    }
+
+
+async def rollup_series(
+    db: AsyncSession,
+    bucket: str,
+    start: datetime,
+    end: datetime,
+) -> Dict[str, Any]:
+    """Time series of non-empty ``bucket`` rollups in [start, end) plus a summary of the whole window."""
+    result = await db.execute(
+        select(RequestRollup)
+        .where(
+            RequestRollup.bucket == bucket,
+            RequestRollup.bucket_start >= bucket_start(start, bucket),
+            RequestRollup.bucket_start < end,
+        )
+        .order_by(RequestRollup.bucket_start)
+    )
+    points: Dict[datetime, Tuple[Dict[str, Any], Dict[str, int]]] = {}
+    total, total_statuses = _empty_rollup(), {}
+    for row in result.scalars():
+        values = {name: getattr(row, name) for name in _empty_rollup()}
+        merged, statuses = points.setdefault(row.bucket_start, (_empty_rollup(), {}))
+        _merge_rollup(merged, values)
+        _merge_rollup(total, values)
+        statuses[row.response_status] = statuses.get(row.response_status, 0) + row.count
+        total_statuses[row.response_status] = total_statuses.get(row.response_status, 0) + row.count
+    return {
+        "series": [
+            {"start": start_at, **_point(values, statuses)}
+            for start_at, (values, statuses) in points.items()
+        ],
+        "summary": _point(total, total_statuses),
+    }
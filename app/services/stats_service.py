@@ -1,33 +1,343 @@
-from statistics import mean
-from typing import Dict, List, Optional
+import asyncio
+import math
+from datetime import datetime
+from typing import Any, Dict, Optional
 
+from sqlalchemy import func, select
 
-def _quantile(values: List[int], q: float) -> Optional[float]:
-    if not values:
-        return None
-    values_sorted = sorted(values)
-    idx = int(round(q * (len(values_sorted) - 1)))
-    return float(values_sorted[idx])
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.request_history import RequestHistory
+from app.models.stats_sketch import StatsSketch
+from app.services.leader import leader
+
+_SKETCH_NAME = "request_history"
+_REBUILD_BATCH_SIZE = 10000
+
+
+class DDSketch:
+    """Mergeable quantile sketch with a relative error guarantee (DDSketch).
+
+    Positive values go to logarithmic buckets ``ceil(log_gamma(x))`` with
+    ``gamma = (1 + alpha) / (1 - alpha)``, so every reported quantile of
+    positive values is within ``alpha`` relative error of the exact
+    nearest-rank quantile. Zeros (and negatives) are counted exactly.
+    Memory is bounded by the value range, not by the number of values.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float) -> None:
+        if value > 0:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + 1
+        else:
+            self.zero_count += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "DDSketch") -> None:
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        # Same nearest-rank convention as the former exact implementation
+        rank = int(round(q * (self.count - 1)))
+        if rank < self.zero_count:
+            return float(min(self.max, 0.0)) if self.max is not None else 0.0
+        seen = self.zero_count
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return float(min(max(value, self.min), self.max))
+        return float(self.max)
+
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "bins": {str(key): count for key, count in self.bins.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "DDSketch":
+        sketch = cls(payload["relative_accuracy"])
+        sketch.bins = {int(key): count for key, count in payload["bins"].items()}
+        sketch.zero_count = payload["zero_count"]
+        sketch.count = payload["count"]
+        sketch.sum = payload["sum"]
+        sketch.min = payload["min"]
+        sketch.max = payload["max"]
+        return sketch
+
+
+def _summary(sketch: DDSketch) -> Dict[str, Optional[float]]:
+    return {
+        "mean": sketch.mean(),
+        "p50": sketch.quantile(0.50),
+        "p95": sketch.quantile(0.95),
+        "p99": sketch.quantile(0.99),
+        "count": sketch.count,
+    }
 
 
 def build_stats(
-    processing_times: List[int],
-    bytecode_lengths: List[int],
+    processing_times: DDSketch,
+    bytecode_lengths: DDSketch,
 ) -> Dict[str, Dict[str, Optional[float]]]:
     stats = {
-        "processing_time_ms": {
-            "mean": float(mean(processing_times)) if processing_times else None,
-            "p50": _quantile(processing_times, 0.50),
-            "p95": _quantile(processing_times, 0.95),
-            "p99": _quantile(processing_times, 0.99),
-            "count": len(processing_times),
-        },
-        "bytecode_length": {
-            "mean": float(mean(bytecode_lengths)) if bytecode_lengths else None,
-            "p50": _quantile(bytecode_lengths, 0.50),
-            "p95": _quantile(bytecode_lengths, 0.95),
-            "p99": _quantile(bytecode_lengths, 0.99),
-            "count": len(bytecode_lengths),
-        },
+        "processing_time_ms": _summary(processing_times),
+        "bytecode_length": _summary(bytecode_lengths),
     }
     return stats
+
+
+class RequestStats:
+    """Incrementally maintained request statistics backed by quantile sketches.
+
+    Updated as history rows are persisted and saved to ``stats_sketches``
+    every ``persist_interval_s``. When nothing has been saved yet, the
+    sketches are rebuilt once from ``request_history`` in the background.
+
+    With several worker processes each one saves only what it recorded since
+    its last save, merged into the stored row, and then adopts the merged
+    result; other workers' requests show up after their next save. Only the
+    ``leader`` process rebuilds; the others hold on to what they recorded
+    until its row exists.
+    """
+
+    def __init__(self, relative_accuracy: float, persist_interval_s: float) -> None:
+        self.relative_accuracy = relative_accuracy
+        self.persist_interval_s = persist_interval_s
+        self.ready = False
+        self._task: Optional[asyncio.Task] = None
+        self._unsaved: Optional[RequestStats] = None
+        self._rebuilt: Optional[RequestStats] = None
+        self._rebuild_up_to: Optional[int] = None
+        self.reset()
+
+    def reset(self) -> None:
+        self.total_requests = 0
+        self.processing_times = DDSketch(self.relative_accuracy)
+        self.bytecode_lengths = DDSketch(self.relative_accuracy)
+        self.stage_timings: Dict[str, DDSketch] = {}
+        self._unsaved = None
+
+    def record(
+        self,
+        processing_time_ms: Optional[int],
+        bytecode_length: Optional[int],
+        stage_timings_ms: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self._add(processing_time_ms, bytecode_length, stage_timings_ms)
+        if self._unsaved is None:
+            self._unsaved = RequestStats(self.relative_accuracy, self.persist_interval_s)
+        self._unsaved._add(processing_time_ms, bytecode_length, stage_timings_ms)
+
+    def _add(
+        self,
+        processing_time_ms: Optional[int],
+        bytecode_length: Optional[int],
+        stage_timings_ms: Optional[Dict[str, float]],
+    ) -> None:
+        self.total_requests += 1
+        if processing_time_ms is not None:
+            self.processing_times.add(processing_time_ms)
+        if bytecode_length is not None:
+            self.bytecode_lengths.add(bytecode_length)
+        for stage, duration_ms in (stage_timings_ms or {}).items():
+            sketch = self.stage_timings.get(stage)
+            if sketch is None:
+                sketch = self.stage_timings[stage] = DDSketch(self.relative_accuracy)
+            sketch.add(duration_ms)
+
+    def _merge(self, other: "RequestStats") -> None:
+        self.total_requests += other.total_requests
+        self.processing_times.merge(other.processing_times)
+        self.bytecode_lengths.merge(other.bytecode_lengths)
+        for stage, sketch in other.stage_timings.items():
+            self.stage_timings.setdefault(stage, DDSketch(self.relative_accuracy)).merge(sketch)
+
+    def _adopt(self, other: "RequestStats") -> None:
+        self.total_requests = other.total_requests
+        self.processing_times = other.processing_times
+        self.bytecode_lengths = other.bytecode_lengths
+        self.stage_timings = other.stage_timings
+
+    def _load(self, payload: Dict[str, Any]) -> None:
+        self.total_requests = payload["total_requests"]
+        self.processing_times = DDSketch.from_dict(payload["processing_time_ms"])
+        self.bytecode_lengths = DDSketch.from_dict(payload["bytecode_length"])
+        self.stage_timings = {
+            stage: DDSketch.from_dict(sketch)
+            for stage, sketch in payload.get("stage_timings_ms", {}).items()
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "total_requests": self.total_requests,
+            "stats": build_stats(self.processing_times, self.bytecode_lengths),
+            "stage_timings_ms": {
+                stage: _summary(sketch) for stage, sketch in sorted(self.stage_timings.items())
+            },
+            "relative_error": self.relative_accuracy,
+            "complete": self.ready,
+        }
+
+    def _payload(self) -> Dict[str, Any]:
+        return {
+            "total_requests": self.total_requests,
+            "processing_time_ms": self.processing_times.to_dict(),
+            "bytecode_length": self.bytecode_lengths.to_dict(),
+            "stage_timings_ms": {stage: sketch.to_dict() for stage, sketch in self.stage_timings.items()},
+        }
+
+    async def start(self) -> None:
+        """Load the saved sketches, or schedule a one-off rebuild from history."""
+        async with AsyncSessionLocal() as session:
+            saved = await session.get(StatsSketch, _SKETCH_NAME)
+            last_id = None
+            if saved is None:
+                last_id = await session.scalar(select(func.max(RequestHistory.id)))
+        if saved is not None:
+            self._load(saved.payload)
+            self.ready = True
+        elif last_id is None:
+            self.ready = True
+        else:
+            self._rebuild_up_to = last_id
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.persist()
+
+    async def persist(self, replace: bool = False) -> None:
+        """Merge what was recorded since the last save into the saved row and adopt the result.
+
+        ``replace`` overwrites the row with this process's state instead (after
+        ``reset``). A pending rebuild is only used when no row exists yet.
+        Without a row or a rebuild of its own a process that is not ``ready``
+        saves nothing: the leader is still rebuilding.
+        """
+        merged = RequestStats(self.relative_accuracy, self.persist_interval_s)
+        if replace:
+            merged._merge(self)
+        unsaved, self._unsaved = self._unsaved, None
+        try:
+            async with AsyncSessionLocal() as session:
+                async with session.begin():
+                    saved = await session.get(StatsSketch, _SKETCH_NAME, with_for_update=True)
+                    if not replace:
+                        if saved is not None:
+                            merged._load(saved.payload)
+                        elif self._rebuilt is not None:
+                            merged._merge(self._rebuilt)
+                        elif not self.ready:
+                            self._keep_unsaved(unsaved)
+                            return
+                        if unsaved is not None:
+                            merged._merge(unsaved)
+                    if saved is None:
+                        session.add(StatsSketch(name=_SKETCH_NAME, payload=merged._payload()))
+                    else:
+                        saved.payload = merged._payload()
+                        saved.updated_at = datetime.utcnow()
+        except Exception:
+            if not replace:
+                self._keep_unsaved(unsaved)
+            raise
+        # Rows recorded while saving are not in the merged state yet
+        late = self._unsaved
+        self._adopt(merged)
+        if late is not None:
+            self._merge(late)
+        self._rebuilt = None
+        self._rebuild_up_to = None
+        self.ready = True
+
+    def _keep_unsaved(self, unsaved: Optional["RequestStats"]) -> None:
+        """Put back what a save did not store, ahead of anything recorded since."""
+        if unsaved is not None:
+            if self._unsaved is not None:
+                unsaved._merge(self._unsaved)
+            self._unsaved = unsaved
+
+    async def _rebuild(self, last_id: int) -> None:
+        """Fold rows up to ``last_id`` into sketches for ``persist``; newer rows are recorded live."""
+        rebuilt = RequestStats(self.relative_accuracy, self.persist_interval_s)
+        after_id = 0
+        while after_id < last_id:
+            async with AsyncSessionLocal() as session:
+                rows = (
+                    await session.execute(
+                        select(
+                            RequestHistory.id,
+                            RequestHistory.processing_time_ms,
+                            RequestHistory.bytecode_length,
+                            RequestHistory.stage_timings_ms,
+                        )
+                        .where(RequestHistory.id > after_id, RequestHistory.id <= last_id)
+                        .order_by(RequestHistory.id)
+                        .limit(_REBUILD_BATCH_SIZE)
+                    )
+                ).all()
+            if not rows:
+                break
+            for _, processing_time_ms, bytecode_length, stage_timings_ms in rows:
+                rebuilt.record(processing_time_ms, bytecode_length, stage_timings_ms)
+            after_id = rows[-1][0]
+        self._rebuilt = rebuilt
+
+    async def _run(self) -> None:
+        while True:
+            if self._rebuild_up_to is not None and self._rebuilt is None and leader.acquire():
+                try:
+                    await self._rebuild(self._rebuild_up_to)
+                    await self.persist()
+                except Exception as exc:
+                    print(f"✗ Error rebuilding request stats: {type(exc).__name__}: {exc}")
+            await asyncio.sleep(self.persist_interval_s)
+            try:
+                await self.persist()
+            except Exception as exc:
+                print(f"✗ Error saving request stats: {type(exc).__name__}: {exc}")
+
+
+request_stats = RequestStats(
+    relative_accuracy=settings.stats_sketch_relative_accuracy,
+    persist_interval_s=settings.stats_sketch_persist_interval_s,
+)
@@ -0,0 +1,85 @@
+import os
+from typing import Any, Dict, List, Optional
+
+# Set by gunicorn.conf.py in the master before it forks the workers
+MASTER_PID_ENV = "PREFORK_MASTER_PID"
+
+_SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def _smaps_rollup(pid: int) -> Optional[Dict[str, int]]:
+    """Memory totals of a process in kB from /proc (Linux 4.14+)."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as handle:
+            lines = handle.read().splitlines()
+    except OSError:
+        return None
+    values = {}
+    for line in lines:
+        key, _, rest = line.partition(":")
+        if key in _SMAPS_FIELDS:
+            values[key] = int(rest.split()[0])
+    return values
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as handle:
+                # The command name is in parentheses and may contain spaces
+                fields = handle.read().rpartition(")")[2].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def process_memory(pid: int) -> Optional[Dict[str, Any]]:
+    values = _smaps_rollup(pid)
+    if values is None:
+        return None
+    shared = values.get("Shared_Clean", 0) + values.get("Shared_Dirty", 0)
+    private = values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)
+    return {
+        "pid": pid,
+        "rss_mb": round(values.get("Rss", 0) / 1024, 1),
+        "pss_mb": round(values.get("Pss", 0) / 1024, 1),
+        "shared_mb": round(shared / 1024, 1),
+        "private_mb": round(private / 1024, 1),
+    }
+
+
+def memory_report() -> Dict[str, Any]:
+    """RSS, PSS and shared/private memory of the prefork master and each of its workers.
+
+    RSS counts shared pages in every process that maps them, PSS splits them
+    between those processes. The sum of PSS is what the server really uses;
+    the sum of RSS minus that is what copy-on-write sharing saves. Outside the
+    prefork mode only the current process is reported.
+    """
+    master_pid = int(os.environ.get(MASTER_PID_ENV) or 0)
+    if master_pid:
+        master = process_memory(master_pid)
+        workers = [
+            memory for memory in (process_memory(pid) for pid in _children(master_pid))
+            if memory is not None
+        ]
+    else:
+        master = None
+        workers = [memory for memory in (process_memory(os.getpid()),) if memory is not None]
+    processes = workers + ([master] if master is not None else [])
+    total_rss = sum(memory["rss_mb"] for memory in processes)
+    total_pss = sum(memory["pss_mb"] for memory in processes)
+    return {
+        "mode": "prefork" if master_pid else "single",
+        "current_pid": os.getpid(),
+        "master": master,
+        "workers": workers,
+        "total_rss_mb": round(total_rss, 1),
+        "total_pss_mb": round(total_pss, 1),
+        "shared_savings_mb": round(total_rss - total_pss, 1),
+    }
@@ -0,0 +1,263 @@
+import asyncio
+from collections import deque
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.bytecode_store import blob_insert, compress
+from app.services.feature_store import metadata_values
+from app.services.metrics import forward_stage_duration_seconds
+from app.services.rollup_service import apply_rollups
+from app.services.stats_service import request_stats
+from app.models.contract import Contract, ContractMetadata
+from app.models.request_history import RequestHistory
+from app.models.request_profile import RequestProfile
+
+# (kind, row values, contract features or None, raw contract bytecode or None)
+Record = Tuple[str, Dict[str, Any], Optional[Dict[str, Any]], Optional[bytes]]
+
+
+def _contract_insert(dialect_name: str, rows: List[Dict[str, Any]]):
+    """INSERT ... ON CONFLICT DO NOTHING for contracts, so each bytecode is scored once per model.
+
+    Returns the ids of the rows actually inserted, keyed by ``(bytecode_hash, model_version)``.
+    """
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    return (
+        dialect.insert(Contract)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[Contract.bytecode_hash, Contract.model_version])
+        .returning(Contract.id, Contract.bytecode_hash, Contract.model_version)
+    )
+
+
+class WriteBehindWriter:
+    """Buffers contract and history rows and inserts them in batches off the request path.
+
+    Records are flushed when ``batch_size`` are pending or ``flush_interval_ms``
+    after the first one arrived, using one multi-row INSERT per table. The queue
+    is bounded: when it is full, enqueueing waits for the next flush.
+
+    A failed batch is retried ``max_retries`` times with exponential backoff,
+    then written one record per transaction so a single bad row cannot take
+    unrelated rows down with it. Records that still fail are counted in
+    ``dropped`` and the most recent ones kept in ``dead_letters``.
+    """
+
+    def __init__(
+        self,
+        queue_size: int,
+        batch_size: int,
+        flush_interval_ms: float,
+        max_retries: int = 3,
+        retry_backoff_ms: float = 100,
+        dead_letter_size: int = 100,
+    ) -> None:
+        self.queue_size = queue_size
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_ms = flush_interval_ms
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff_ms = retry_backoff_ms
+        self.enqueued = 0
+        self.flushed = 0
+        self.failed = 0
+        self.retries = 0
+        self.dropped = 0
+        self.dead_letters: deque = deque(maxlen=dead_letter_size)
+        self.flushes = 0
+        self.queue_full_waits = 0
+        self.last_flush_ms: Optional[float] = None
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+        self.last_lag_ms: Optional[float] = None
+        self.max_lag_ms = 0.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Drain everything still queued, then stop the flusher."""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._queue = None
+
+    async def add_contract(self, contract: Dict[str, Any], features: Dict[str, Any], code: bytes) -> None:
+        """Queue a contract row; ``code`` goes to the bytecode store under ``contract["bytecode_hash"]``."""
+        await self._put(("contract", contract, features, code))
+
+    async def add_history(self, history: Dict[str, Any]) -> None:
+        # Stamp at request time so the row and its rollup bucket agree
+        history.setdefault("timestamp", datetime.utcnow())
+        # Every row in a multi-row INSERT needs the same keys
+        history.setdefault("stage_timings_ms", None)
+        history.setdefault("bytecode_hash", None)
+        history.setdefault("prediction", None)
+        await self._put(("history", history, None, None))
+
+    async def add_profile(self, profile: Dict[str, Any]) -> None:
+        await self._put(("profile", profile, None, None))
+
+    async def _put(self, record: Record) -> None:
+        self.start()
+        if self._queue.full():
+            self.queue_full_waits += 1
+        await self._queue.put((perf_counter(), record))
+        self.enqueued += 1
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval_ms / 1000
+            while len(batch) < self.batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, records: List[Record]) -> None:
+        """Insert ``records`` in one transaction, one multi-row INSERT per table."""
+        contracts = [(row, features, code) for kind, row, features, code in records if kind == "contract"]
+        histories = [row for kind, row, _, _ in records if kind == "history"]
+        profiles = [row for kind, row, _, _ in records if kind == "profile"]
+        blobs = {
+            row["bytecode_hash"]: {"hash": row["bytecode_hash"], "data": compress(code), "size": len(code)}
+            for row, _, code in contracts
+        }
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                if blobs:
+                    await session.execute(blob_insert(session.bind.dialect.name, blobs.values()))
+                if contracts:
+                    result = await session.execute(
+                        _contract_insert(session.bind.dialect.name, [row for row, _, _ in contracts])
+                    )
+                    # Contracts that were already stored (by another worker or an
+                    # earlier batch) return no id and keep their existing metadata
+                    contract_ids = {
+                        (digest, model_version): contract_id for contract_id, digest, model_version in result
+                    }
+                    metadata = []
+                    for row, features, _ in contracts:
+                        contract_id = contract_ids.pop((row["bytecode_hash"], row["model_version"]), None)
+                        if contract_id is not None:
+                            metadata.append({"contract_id": contract_id, **metadata_values(features)})
+                    if metadata:
+                        await session.execute(insert(ContractMetadata), metadata)
+                if histories:
+                    await session.execute(insert(RequestHistory), histories)
+                    await apply_rollups(session, histories)
+                if profiles:
+                    await session.execute(insert(RequestProfile), profiles)
+        self.flushed += len(records)
+        for row in histories:
+            request_stats.record(row["processing_time_ms"], row["bytecode_length"], row["stage_timings_ms"])
+
+    async def _write_with_retry(self, records: List[Record]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._write(records)
+                return
+            except Exception as exc:
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                delay_ms = self.retry_backoff_ms * 2 ** attempt
+                print(
+                    f"✗ Error flushing {len(records)} records, retrying in {delay_ms:.0f} ms: "
+                    f"{type(exc).__name__}: {exc}"
+                )
+                await asyncio.sleep(delay_ms / 1000)
+
+    async def _flush(self, batch: List[Tuple[float, Record]]) -> None:
+        start = perf_counter()
+        records = [record for _, record in batch]
+        try:
+            await self._write_with_retry(records)
+            forward_stage_duration_seconds.observe(perf_counter() - start, "db_commit")
+        except Exception as exc:
+            self.failed += len(records)
+            print(
+                f"✗ Error flushing {len(records)} records: {type(exc).__name__}: {exc}; "
+                "writing them one by one"
+            )
+            # Isolate the bad rows: everything else still gets written
+            for record in records:
+                try:
+                    await self._write([record])
+                except Exception as record_exc:
+                    self.dropped += 1
+                    self.dead_letters.append({
+                        "kind": record[0],
+                        "row": record[1],
+                        "error": f"{type(record_exc).__name__}: {record_exc}",
+                    })
+                    print(f"✗ Dropped {record[0]} record: {type(record_exc).__name__}: {record_exc}")
+
+        finished = perf_counter()
+        flush_ms = (finished - start) * 1000
+        lag_ms = (finished - batch[0][0]) * 1000
+        self.flushes += 1
+        self.last_flush_ms = flush_ms
+        self.max_flush_ms = max(self.max_flush_ms, flush_ms)
+        self.total_flush_ms += flush_ms
+        self.last_lag_ms = lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        queued = self._queue.qsize() if self._queue is not None else 0
+        return {
+            "queue_size": self.queue_size,
+            "queued": queued,
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "dropped": self.dropped,
+            "dead_letters": [
+                {"kind": letter["kind"], "error": letter["error"]} for letter in self.dead_letters
+            ],
+            "flushes": self.flushes,
+            "queue_full_waits": self.queue_full_waits,
+            "last_flush_ms": self.last_flush_ms,
+            "mean_flush_ms": self.total_flush_ms / self.flushes if self.flushes else None,
+            "max_flush_ms": self.max_flush_ms,
+            "last_lag_ms": self.last_lag_ms,
+            "max_lag_ms": self.max_lag_ms,
+        }
+
+
+write_behind = WriteBehindWriter(
+    queue_size=settings.write_behind_queue_size,
+    batch_size=settings.write_behind_batch_size,
+    flush_interval_ms=settings.write_behind_flush_interval_ms,
+    max_retries=settings.write_behind_max_retries,
+    retry_backoff_ms=settings.write_behind_retry_backoff_ms,
+)
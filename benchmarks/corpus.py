@@ -0,0 +1,131 @@
+"""Benchmark corpus: real contracts plus synthetic bytecodes of controlled size and shape."""
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+import pandas as pd
+
+SYNTHETIC_SIZES_KB = (1, 2, 4, 8, 16, 24)
+SYNTHETIC_KINDS = ("call_heavy", "arithmetic_heavy", "mixed")
+
+# PUSH1 0 x5, PUSH20 <address>, GAS, CALL, POP; then BALANCE / STATICCALL / DELEGATECALL variants
+_ADDRESS = "ab" * 20
+_CALL_BLOCKS = (
+    "6000600060006000600073" + _ADDRESS + "5af150",
+    "73" + _ADDRESS + "3150",
+    "600060006000600073" + _ADDRESS + "5afa50",
+    "600060006000600073" + _ADDRESS + "5af450",
+    "3360005560005415",
+)
+# PUSH1 operands feeding ADD, MUL, SUB, DIV, MOD, EXP, ADDMOD, MULMOD and a JUMPDEST
+_ARITHMETIC_BLOCKS = (
+    "6003600501",
+    "6007600902",
+    "6002600403",
+    "6003600c04",
+    "6005601106",
+    "600260030a",
+    "60076003600208",
+    "60076003600209",
+    "5b",
+)
+
+
+class Contract(NamedTuple):
+    name: str
+    source: str
+    bytecode: str
+
+    @property
+    def size_bytes(self) -> int:
+        return (len(self.bytecode) - 2) // 2 if self.bytecode.startswith("0x") else len(self.bytecode) // 2
+
+
+def _normalize(bytecode: Any) -> Optional[str]:
+    if not isinstance(bytecode, str) or not bytecode.strip():
+        return None
+    bytecode = bytecode.strip()
+    return bytecode if bytecode.startswith("0x") else "0x" + bytecode
+
+
+def load_examples(path: Path) -> List[Contract]:
+    frame = pd.read_excel(path)
+    contracts = []
+    for index, bytecode in enumerate(frame["bytecode"]):
+        bytecode = _normalize(bytecode)
+        if bytecode is not None:
+            contracts.append(Contract(f"examples-{index}", "examples", bytecode))
+    return contracts
+
+
+def _bytecode_from_record(record: Dict[str, Any]) -> Any:
+    """A /forward request body, a /forward/batch item or a /history/export?include=bytecode line.
+
+    Exports made before history rows were slimmed carry the bytecode in ``response_data``.
+    """
+    if "bytecode" in record:
+        return record["bytecode"]
+    response_data = record.get("response_data") or {}
+    return (response_data.get("data") or {}).get("bytecode")
+
+
+def load_jsonl(path: Path) -> List[Contract]:
+    contracts = []
+    with open(path, encoding="utf-8") as handle:
+        for index, line in enumerate(handle):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            bytecode = _normalize(_bytecode_from_record(record) if isinstance(record, dict) else record)
+            if bytecode is not None:
+                contracts.append(Contract(f"{path.stem}-{index}", "jsonl", bytecode))
+    return contracts
+
+
+def _fill(blocks: Iterable[str], size_bytes: int, rng: random.Random) -> str:
+    blocks = list(blocks)
+    parts: List[str] = []
+    length = 0
+    while length < size_bytes * 2:
+        block = rng.choice(blocks)
+        parts.append(block)
+        length += len(block)
+    # Trim on a byte boundary; a truncated trailing PUSH is part of real-world input too
+    return "".join(parts)[: size_bytes * 2]
+
+
+def _random_code(size_bytes: int, rng: random.Random) -> str:
+    code = bytearray()
+    while len(code) < size_bytes:
+        opcode = rng.randrange(256)
+        code.append(opcode)
+        if 0x60 <= opcode <= 0x7F:
+            code.extend(rng.randbytes(opcode - 0x5F))
+    return code[:size_bytes].hex()
+
+
+def synthetic(kind: str, size_kb: int, seed: int = 0) -> Contract:
+    rng = random.Random(f"{kind}-{size_kb}-{seed}")
+    size_bytes = size_kb * 1024
+    if kind == "call_heavy":
+        code = _fill(_CALL_BLOCKS, size_bytes, rng)
+    elif kind == "arithmetic_heavy":
+        code = _fill(_ARITHMETIC_BLOCKS, size_bytes, rng)
+    elif kind == "mixed":
+        code = _random_code(size_bytes, rng)
+    else:
+        raise ValueError(f"unknown synthetic kind: {kind}")
+    return Contract(f"{kind}-{size_kb}kb", kind, "0x" + code)
+
+
+def build_corpus(examples: Optional[Path] = None, jsonl: Iterable[Path] = ()) -> List[Contract]:
+    contracts: List[Contract] = []
+    if examples is not None and examples.exists():
+        contracts.extend(load_examples(examples))
+    for path in jsonl:
+        contracts.extend(load_jsonl(path))
+    for kind in SYNTHETIC_KINDS:
+        for size_kb in SYNTHETIC_SIZES_KB:
+            contracts.append(synthetic(kind, size_kb))
+    return contracts
@@ -0,0 +1,220 @@
+"""Offline benchmarks for the feature extractor and the inference path.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --baseline bench.json --threshold 0.1
+
+The corpus is ``examples.xlsx`` plus any ``--jsonl`` files (``/forward`` bodies,
+``/forward/batch`` items or ``/history/export?include=bytecode`` lines) and synthetic 1-24 KB
+call-heavy, arithmetic-heavy and random bytecodes. With ``--baseline`` every
+metric is compared to the saved run and the exit status is 1 when one got
+worse by more than ``--threshold`` (a fraction).
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.corpus import Contract, build_corpus
+
+_ROOT = Path(__file__).resolve().parents[1]
+
+Metrics = Dict[str, Dict[str, Any]]
+
+
+def _metric(value: float, unit: str, better: str) -> Dict[str, Any]:
+    return {"value": value, "unit": unit, "better": better}
+
+
+def _best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    """Fastest of ``repeat`` runs in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        fn()
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def _peak_mb(fn: Callable[[], Any]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2**20
+
+
+def bench_extraction(corpus: List[Contract], repeat: int, metrics: Metrics) -> List[Dict[str, Any]]:
+    from app.features.evm_extractor import EVMBytecodeFeatureExtractor
+
+    extractor = EVMBytecodeFeatureExtractor(n_workers=1)
+    for contract in corpus:
+        extractor._extract_features_single(contract.bytecode)
+
+    per_contract = []
+    for contract in corpus:
+        seconds = _best_of(repeat, lambda: extractor._extract_features_single(contract.bytecode))
+        per_contract.append({
+            "name": contract.name,
+            "source": contract.source,
+            "size_bytes": contract.size_bytes,
+            "extract_ms": seconds * 1000,
+        })
+
+    total_ms = sum(row["extract_ms"] for row in per_contract)
+    total_kb = sum(row["size_bytes"] for row in per_contract) / 1024
+    metrics["extract_single.total_ms"] = _metric(total_ms, "ms", "lower")
+    metrics["extract_single.per_kb_us"] = _metric(total_ms * 1000 / total_kb, "us/KB", "lower")
+    times = [row["extract_ms"] for row in per_contract]
+    metrics["extract_single.p50_ms"] = _metric(float(np.percentile(times, 50)), "ms", "lower")
+    metrics["extract_single.max_ms"] = _metric(max(times), "ms", "lower")
+    for source in sorted({row["source"] for row in per_contract}):
+        source_ms = sum(row["extract_ms"] for row in per_contract if row["source"] == source)
+        metrics[f"extract_single.{source}.total_ms"] = _metric(source_ms, "ms", "lower")
+
+    metrics["memory.extract_single_peak_mb"] = _metric(
+        _peak_mb(lambda: [extractor._extract_features_single(c.bytecode) for c in corpus]),
+        "MB",
+        "lower",
+    )
+    return per_contract
+
+
+def bench_transform(corpus: List[Contract], workers: List[int], copies: int, repeat: int, metrics: Metrics) -> None:
+    from app.features.evm_extractor import EVMBytecodeFeatureExtractor
+
+    frame = pd.DataFrame({"bytecode": [contract.bytecode for contract in corpus] * copies})
+    megabytes = sum(contract.size_bytes for contract in corpus) * copies / 2**20
+    for n_workers in workers:
+        extractor = EVMBytecodeFeatureExtractor(n_workers=n_workers)
+        extractor.transform(frame)
+        seconds = _best_of(repeat, lambda: extractor.transform(frame))
+        metrics[f"transform.n_workers_{n_workers}.contracts_per_s"] = _metric(len(frame) / seconds, "contracts/s", "higher")
+        metrics[f"transform.n_workers_{n_workers}.mb_per_s"] = _metric(megabytes / seconds, "MB/s", "higher")
+
+    extractor = EVMBytecodeFeatureExtractor(n_workers=1)
+    metrics["memory.transform_peak_mb"] = _metric(_peak_mb(lambda: extractor.transform(frame)), "MB", "lower")
+
+
+def bench_predict(corpus: List[Contract], repeat: int, metrics: Metrics) -> Optional[str]:
+    """Single-row ``predict_with_features`` latency; returns a reason when skipped."""
+    from app.services import evm_inference
+
+    try:
+        evm_inference.warm_up()
+    except RuntimeError as exc:
+        return str(exc)
+
+    latencies = [
+        _best_of(repeat, lambda: evm_inference.predict_with_features(contract.bytecode)) * 1000
+        for contract in corpus
+    ]
+    metrics["predict_single.p50_ms"] = _metric(float(np.percentile(latencies, 50)), "ms", "lower")
+    metrics["predict_single.p95_ms"] = _metric(float(np.percentile(latencies, 95)), "ms", "lower")
+    metrics["predict_single.mean_ms"] = _metric(statistics.fmean(latencies), "ms", "lower")
+    return None
+
+
+def compare(current: Metrics, baseline: Metrics, threshold: float) -> List[Dict[str, Any]]:
+    """Metrics present in both runs, with the relative change and a regression flag."""
+    rows = []
+    for name, metric in current.items():
+        previous = baseline.get(name)
+        if previous is None or not previous["value"]:
+            continue
+        change = metric["value"] / previous["value"] - 1
+        worse = change if metric["better"] == "lower" else -change
+        rows.append({
+            "metric": name,
+            "baseline": previous["value"],
+            "current": metric["value"],
+            "unit": metric["unit"],
+            "change": change,
+            "regression": worse > threshold,
+        })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--examples", type=Path, default=_ROOT / "examples.xlsx")
+    parser.add_argument("--jsonl", type=Path, action="append", default=[], help="extra JSON-lines corpus files")
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated n_workers values for transform")
+    parser.add_argument("--copies", type=int, default=8, help="corpus copies per transform batch")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement; the fastest is kept")
+    parser.add_argument("--model", help="model artifact for the predict benchmark (default: MODEL_PATH)")
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown")
+    args = parser.parse_args(argv)
+
+    if args.model:
+        os.environ["MODEL_PATH"] = args.model
+    sys.path.insert(0, str(_ROOT))
+
+    corpus = build_corpus(args.examples, args.jsonl)
+    metrics: Metrics = {}
+    per_contract = bench_extraction(corpus, args.repeat, metrics)
+    bench_transform(corpus, [int(n) for n in args.workers.split(",")], args.copies, args.repeat, metrics)
+    predict_skipped = bench_predict(corpus, args.repeat, metrics)
+    metrics["memory.max_rss_mb"] = _metric(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, "MB", "lower"
+    )
+
+    results = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "corpus_size": len(corpus),
+            "corpus_bytes": sum(contract.size_bytes for contract in corpus),
+            "repeat": args.repeat,
+            "predict_skipped": predict_skipped,
+        },
+        "metrics": metrics,
+        "contracts": per_contract,
+    }
+
+    for name, metric in metrics.items():
+        print(f"{name:<48} {metric['value']:>12.3f} {metric['unit']}")
+    if predict_skipped:
+        print(f"predict benchmark skipped: {predict_skipped}")
+
+    status = 0
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        rows = compare(metrics, baseline["metrics"], args.threshold)
+        results["comparison"] = {"baseline": str(args.baseline), "threshold": args.threshold, "metrics": rows}
+        regressions = [row for row in rows if row["regression"]]
+        for row in regressions:
+            print(f"✗ {row['metric']}: {row['baseline']:.3f} -> {row['current']:.3f} {row['unit']} ({row['change']:+.1%})")
+        if regressions:
+            status = 1
+        else:
+            print(f"✓ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,10 @@ module.exports = {
       env: {
         APP_HOST: "127.0.0.1",
         APP_PORT: "8000",
+        WEB_WORKERS: "4",
+        WEB_MAX_REQUESTS: "10000",
+        WEB_MAX_REQUESTS_JITTER: "1000",
+        WEB_WORKER_TIMEOUT: "60",
         NGINX_SETUP: "0",
         STOP_DB_ON_EXIT: "0",
         INSTALL_REQUIREMENTS: "0",
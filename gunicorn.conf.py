@@ -0,0 +1,61 @@
+"""Gunicorn settings for serving with several workers (``WEB_WORKERS`` > 1, see app.sh).
+
+The master imports the app and loads the model once, then forks the
+workers, so they share those pages copy-on-write instead of each one
+importing pandas/sklearn and unpickling its own model. Compare
+``total_rss_mb`` and ``total_pss_mb`` in GET /admin/memory to see the saving.
+
+Everything else a worker keeps in memory is its own: the prediction LRU
+cache, the write-behind buffer and the counters in the ``prediction_cache``,
+``inference``, ``prediction_batches`` and ``write_behind`` sections of
+GET /stats describe only the worker that answered. GET /metrics adds up all
+workers through files in ``METRICS_DIR`` (a fresh temporary directory per run
+unless set), and the request sketches are shared through the database.
+History retention and the one-off stats rebuild run in a single worker,
+whichever holds the leader lock (``LEADER_LOCK_PATH``).
+"""
+import gc
+import os
+import shutil
+import tempfile
+
+# Every web worker is already its own process; an extraction pool per worker
+# would spawn fresh interpreters that share nothing with the master
+os.environ.setdefault("INFERENCE_WORKERS", "0")
+# Workers save their metrics here so /metrics can add them up (see Registry)
+_OWN_METRICS_DIR = "METRICS_DIR" not in os.environ
+if _OWN_METRICS_DIR:
+    os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="evm-api-metrics-")
+
+from app.core.config import settings  # noqa: E402
+from app.services.worker_memory import MASTER_PID_ENV  # noqa: E402
+
+wsgi_app = "main:app"
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = max(1, settings.web_workers)
+preload_app = True
+# Recycle workers after this many requests (0 = never); forks are cheap with the model preloaded
+max_requests = settings.web_max_requests
+max_requests_jitter = settings.web_max_requests_jitter
+timeout = settings.web_worker_timeout
+
+
+def when_ready(server):
+    from app.services import evm_inference
+
+    evm_inference.preload()
+    os.environ[MASTER_PID_ENV] = str(os.getpid())
+    # Keep the collector from touching (and so copying) everything loaded so far
+    gc.freeze()
+    server.log.info("Model %s preloaded, forking %d workers", evm_inference.MODEL_VERSION, workers)
+
+
+def child_exit(server, worker):
+    from app.services.metrics import registry
+
+    registry.mark_dead(worker.pid)
+
+
+def on_exit(server):
+    if _OWN_METRICS_DIR:
+        shutil.rmtree(settings.metrics_dir, ignore_errors=True)
@@ -1,24 +1,55 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import Response
 
+from app.api.middleware import MetricsMiddleware
+from app.api.routes.admin import router as admin_router
 from app.api.routes.auth import router as auth_router
+from app.api.routes.contracts import router as contracts_router
 from app.api.routes.forward import router as forward_router
+from app.api.routes.health import router as health_router
 from app.api.routes.history import router as history_router
+from app.api.routes.metrics import router as metrics_router
 from app.api.routes.stats import router as stats_router
 from app.db.session import init_db
+from app.services import evm_inference
+from app.services.history_retention import history_retention
+from app.services.inference_executor import inference_executor
+from app.services.leader import leader
+from app.services.metrics import registry
+from app.services.stats_service import request_stats
+from app.services.write_behind import write_behind
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database on startup."""
+    """Initialize database, load and warm up the model and workers, then report ready."""
     await init_db()
+    await request_stats.start()
+    await history_retention.start()
+    write_behind.start()
+    registry.start()
+    readiness = await asyncio.to_thread(evm_inference.warm_up)
+    await inference_executor.warm_up()
+    print(
+        f"Model {readiness['model_version']} ready "
+        f"(load {readiness['model_load_ms']:.0f} ms, warm-up {readiness['warmup_ms']:.0f} ms)"
+    )
     yield
+    evm_inference.mark_not_ready()
+    await write_behind.stop()
+    await registry.stop()
+    await request_stats.stop()
+    await history_retention.stop()
+    leader.release()
+    inference_executor.shutdown()
 
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.exception_handler(RequestValidationError)
@@ -35,3 +66,7 @@ app.include_router(forward_router)
 app.include_router(history_router)
 app.include_router(stats_router)
 app.include_router(auth_router)
+app.include_router(health_router)
+app.include_router(contracts_router)
+app.include_router(admin_router)
+app.include_router(metrics_router)
@@ -0,0 +1,139 @@
+"""pack contract features into a float32 vector
+
+Revision ID: 01ae85b630b5
+Revises: 178907a1b109
+Create Date: 2026-10-17 06:55:03.095575
+
+"""
+import struct
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '01ae85b630b5'
+down_revision: Union[str, None] = '178907a1b109'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_BATCH_SIZE = 1000
+# Feature schema 1: FEATURE_NAMES and their column types at the time of this revision
+_SCHEMA_VERSION = 1
+_FEATURE_NAMES = (
+    'total_instructions', 'unique_instructions', 'block_dependent_count', 'block_dependency_index',
+    'has_TIMESTAMP', 'has_NUMBER', 'has_DIFFICULTY', 'has_GASLIMIT', 'has_COINBASE',
+    'has_BLOCKHASH', 'environmental_instructions_count', 'environmental_ratio',
+    'unique_environmental_ops', 'environmental_complexity', 'balance_operations',
+    'address_operations', 'caller_operations', 'origin_operations', 'callvalue_operations',
+    'external_dependency_index', 'calldata_size_ops', 'calldata_load_ops', 'calldata_copy_ops',
+    'total_calldata_ops', 'calldata_density', 'external_call_count', 'has_external_calls',
+    'call_value_ops', 'call_gas_limit_ops', 'potential_reentrancy_pattern', 'reads_from_memory',
+    'writes_to_memory', 'memory_access_ratio', 'pushes', 'pops', 'stack_imbalance',
+    'stack_operations_ratio', 'stack_underflow_risk', 'total_gas_cost', 'avg_gas_per_instruction',
+    'max_gas_instruction', 'high_gas_instructions', 'gas_dos_risk_index', 'arithmetic_ops_count',
+    'arithmetic_density', 'unsafe_arithmetic_pattern', 'control_flow_ops', 'jumpi_count',
+    'conditional_branching_ratio', 'control_flow_complexity', 'caller_based_checks',
+    'origin_usage', 'access_control_ratio', 'uses_origin_instead_caller',
+    'balance_before_external_call', 'randomness_ops_count', 'has_bad_randomness_pattern',
+    'dangerous_ops_count', 'dangerous_ops_density', 'opcode_entropy', 'reentrancy_risk_score',
+    'frontrunning_risk_score', 'dos_risk_score', 'arithmetic_risk_score',
+    'overall_security_risk_score', 'has_reentrancy_indicators', 'has_unchecked_external_calls',
+    'has_arithmetic_vulnerabilities', 'has_access_control_issues', 'has_dos_vulnerabilities',
+)
+_FLOAT_FEATURES = frozenset((
+    'block_dependency_index', 'environmental_ratio', 'environmental_complexity',
+    'external_dependency_index', 'calldata_density', 'memory_access_ratio',
+    'stack_operations_ratio', 'total_gas_cost', 'avg_gas_per_instruction', 'max_gas_instruction',
+    'gas_dos_risk_index', 'arithmetic_density', 'conditional_branching_ratio',
+    'control_flow_complexity', 'access_control_ratio', 'dangerous_ops_density', 'opcode_entropy',
+    'reentrancy_risk_score', 'frontrunning_risk_score', 'dos_risk_score', 'arithmetic_risk_score',
+    'overall_security_risk_score',
+))
+# Typed columns that stay next to the vector
+_KEPT = frozenset((
+    'total_instructions', 'overall_security_risk_score', 'has_reentrancy_indicators',
+    'has_unchecked_external_calls', 'has_arithmetic_vulnerabilities', 'has_access_control_issues',
+    'has_dos_vulnerabilities',
+))
+_DROPPED = tuple(name for name in _FEATURE_NAMES if name not in _KEPT)
+_VECTOR = struct.Struct(f"<{len(_FEATURE_NAMES)}f")
+
+contract_metadata = sa.table(
+    "contract_metadata",
+    sa.column("id", sa.Integer),
+    sa.column("feature_schema_version", sa.SmallInteger),
+    sa.column("feature_vector", sa.LargeBinary),
+    *(sa.column(name, sa.Double if name in _FLOAT_FEATURES else sa.Integer) for name in _FEATURE_NAMES),
+)
+
+
+def _column_type(name):
+    return sa.Double() if name in _FLOAT_FEATURES else sa.Integer()
+
+
+def _batches(conn, *columns):
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(contract_metadata.c.id, *columns)
+            .where(contract_metadata.c.id > last_id)
+            .order_by(contract_metadata.c.id)
+            .limit(_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('contract_metadata', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('feature_schema_version', sa.SmallInteger(), nullable=True))
+        batch_op.add_column(sa.Column('feature_vector', sa.LargeBinary(), nullable=True))
+
+    conn = op.get_bind()
+    feature_columns = [contract_metadata.c[name] for name in _FEATURE_NAMES]
+    for rows in _batches(conn, *feature_columns):
+        conn.execute(
+            contract_metadata.update()
+            .where(contract_metadata.c.id == sa.bindparam("b_id"))
+            .values(feature_schema_version=_SCHEMA_VERSION, feature_vector=sa.bindparam("b_vector")),
+            [{"b_id": row[0], "b_vector": _VECTOR.pack(*row[1:])} for row in rows],
+        )
+
+    with op.batch_alter_table('contract_metadata', schema=None) as batch_op:
+        batch_op.alter_column('feature_schema_version', existing_type=sa.SmallInteger(), nullable=False)
+        batch_op.alter_column('feature_vector', existing_type=sa.LargeBinary(), nullable=False)
+        for name in _DROPPED:
+            batch_op.drop_column(name)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('contract_metadata', schema=None) as batch_op:
+        for name in _DROPPED:
+            batch_op.add_column(sa.Column(name, _column_type(name), nullable=True))
+
+    conn = op.get_bind()
+    update = contract_metadata.update().where(contract_metadata.c.id == sa.bindparam("b_id")).values(
+        {name: sa.bindparam(f"b_{name}") for name in _DROPPED}
+    )
+    for rows in _batches(conn, contract_metadata.c.feature_vector):
+        values = []
+        for row_id, vector in rows:
+            features = dict(zip(_FEATURE_NAMES, _VECTOR.unpack(vector)))
+            values.append({
+                "b_id": row_id,
+                **{
+                    f"b_{name}": features[name] if name in _FLOAT_FEATURES else int(round(features[name]))
+                    for name in _DROPPED
+                },
+            })
+        conn.execute(update, values)
+
+    with op.batch_alter_table('contract_metadata', schema=None) as batch_op:
+        for name in _DROPPED:
+            batch_op.alter_column(name, existing_type=_column_type(name), nullable=False)
+        batch_op.drop_column('feature_vector')
+        batch_op.drop_column('feature_schema_version')
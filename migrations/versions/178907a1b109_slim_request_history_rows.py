@@ -0,0 +1,169 @@
+"""slim request history rows
+
+Revision ID: 178907a1b109
+Revises: ee4ace87b31e
+Create Date: 2026-10-17 06:49:32.789342
+
+"""
+import hashlib
+import zlib
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '178907a1b109'
+down_revision: Union[str, None] = 'ee4ace87b31e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_BATCH_SIZE = 1000
+
+request_history = sa.table(
+    "request_history",
+    sa.column("id", sa.Integer),
+    sa.column("timestamp", sa.DateTime),
+    sa.column("created_at", sa.DateTime),
+    sa.column("response_status", sa.String),
+    sa.column("response_data", sa.JSON(none_as_null=True)),
+    sa.column("bytecode_hash", sa.String),
+    sa.column("prediction", sa.Integer),
+)
+bytecode_blobs = sa.table(
+    "bytecode_blobs",
+    sa.column("hash", sa.String),
+    sa.column("data", sa.LargeBinary),
+    sa.column("size", sa.Integer),
+    sa.column("created_at", sa.DateTime),
+)
+
+
+def _to_bytes(bytecode):
+    # Same normalization as app.features.evm_decoder.to_bytes at the time of this revision
+    bytecode = (bytecode or "").strip()
+    if bytecode.startswith("0x"):
+        bytecode = bytecode[2:]
+    try:
+        return bytes.fromhex(bytecode)
+    except ValueError:
+        return b""
+
+
+def _success_rows(conn, last_id, *where):
+    return conn.execute(
+        sa.select(
+            request_history.c.id,
+            request_history.c.timestamp,
+            request_history.c.created_at,
+            request_history.c.response_data,
+            request_history.c.bytecode_hash,
+            request_history.c.prediction,
+        )
+        .where(request_history.c.response_status == "success", request_history.c.id > last_id, *where)
+        .order_by(request_history.c.id)
+        .limit(_BATCH_SIZE)
+    ).all()
+
+
+def _update_rows(conn, updates):
+    # timestamp is part of the key on PostgreSQL and prunes the partitions to scan
+    conn.execute(
+        request_history.update()
+        .where(
+            request_history.c.id == sa.bindparam("b_id"),
+            request_history.c.timestamp == sa.bindparam("b_timestamp"),
+        )
+        .values(
+            response_data=sa.bindparam("b_response_data"),
+            bytecode_hash=sa.bindparam("b_hash"),
+            prediction=sa.bindparam("b_prediction"),
+        ),
+        updates,
+    )
+
+
+def upgrade() -> None:
+    op.add_column('request_history', sa.Column('bytecode_hash', sa.String(length=64), nullable=True))
+    op.add_column('request_history', sa.Column('prediction', sa.Integer(), nullable=True))
+
+    # Compact successful rows: the echoed bytecode moves to the blob store (if
+    # it is not there yet) and only its hash and the prediction stay on the row.
+    # PostgreSQL reclaims the freed space on the next (auto)vacuum.
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = _success_rows(conn, last_id)
+        if not rows:
+            break
+        blobs = {}
+        updates = []
+        for row_id, timestamp, _, response_data, _, _ in rows:
+            response_data = response_data or {}
+            bytecode = (response_data.get("data") or {}).get("bytecode")
+            prediction = (response_data.get("result") or {}).get("prediction")
+            digest = None
+            if bytecode:
+                code = _to_bytes(bytecode)
+                digest = hashlib.sha256(code).hexdigest()
+                blobs.setdefault(digest, code)
+            updates.append({
+                "b_id": row_id,
+                "b_timestamp": timestamp,
+                "b_response_data": None,
+                "b_hash": digest,
+                "b_prediction": int(prediction) if prediction is not None else None,
+            })
+        if blobs:
+            stored = set(conn.execute(
+                sa.select(bytecode_blobs.c.hash).where(bytecode_blobs.c.hash.in_(list(blobs)))
+            ).scalars())
+            missing = [
+                {"hash": digest, "data": zlib.compress(code, 6), "size": len(code), "created_at": datetime.utcnow()}
+                for digest, code in blobs.items()
+                if digest not in stored
+            ]
+            if missing:
+                conn.execute(bytecode_blobs.insert(), missing)
+        _update_rows(conn, updates)
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    # Rebuild the full response payloads from the blob store
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = _success_rows(conn, last_id, request_history.c.bytecode_hash.is_not(None))
+        if not rows:
+            break
+        hashes = {row[4] for row in rows}
+        blobs = dict(conn.execute(
+            sa.select(bytecode_blobs.c.hash, bytecode_blobs.c.data).where(bytecode_blobs.c.hash.in_(hashes))
+        ).all())
+        updates = []
+        for row_id, timestamp, created_at, _, digest, prediction in rows:
+            data = blobs.get(digest)
+            created = created_at.isoformat()
+            updates.append({
+                "b_id": row_id,
+                "b_timestamp": timestamp,
+                "b_response_data": {
+                    "status": "success",
+                    "data": {
+                        "bytecode": "0x" + zlib.decompress(data).hex() if data is not None else None,
+                        "text": None,
+                        "created_at": created,
+                    },
+                    "result": {"processed": True, "created_at": created, "prediction": prediction},
+                },
+                "b_hash": digest,
+                "b_prediction": prediction,
+            })
+        _update_rows(conn, updates)
+        last_id = rows[-1][0]
+
+    op.drop_column('request_history', 'prediction')
+    op.drop_column('request_history', 'bytecode_hash')
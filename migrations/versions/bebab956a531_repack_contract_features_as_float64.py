@@ -0,0 +1,68 @@
+"""repack contract features as float64
+
+Revision ID: bebab956a531
+Revises: 01ae85b630b5
+Create Date: 2026-10-17 07:10:00.850315
+
+"""
+import struct
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'bebab956a531'
+down_revision: Union[str, None] = '01ae85b630b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_BATCH_SIZE = 1000
+_FEATURE_COUNT = 70
+# Schema 1 packed FEATURE_NAMES as float32, schema 2 packs the same columns as float64
+_FORMATS = {1: struct.Struct(f"<{_FEATURE_COUNT}f"), 2: struct.Struct(f"<{_FEATURE_COUNT}d")}
+
+contract_metadata = sa.table(
+    "contract_metadata",
+    sa.column("id", sa.Integer),
+    sa.column("feature_schema_version", sa.SmallInteger),
+    sa.column("feature_vector", sa.LargeBinary),
+)
+
+
+def _repack(from_version, to_version):
+    # Widening keeps the float32-rounded values; only new extractions are exact
+    conn = op.get_bind()
+    source, target = _FORMATS[from_version], _FORMATS[to_version]
+    update = (
+        contract_metadata.update()
+        .where(contract_metadata.c.id == sa.bindparam("b_id"))
+        .values(feature_schema_version=to_version, feature_vector=sa.bindparam("b_vector"))
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(contract_metadata.c.id, contract_metadata.c.feature_vector)
+            .where(
+                contract_metadata.c.id > last_id,
+                contract_metadata.c.feature_schema_version == from_version,
+            )
+            .order_by(contract_metadata.c.id)
+            .limit(_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        conn.execute(
+            update,
+            [{"b_id": row_id, "b_vector": target.pack(*source.unpack(vector))} for row_id, vector in rows],
+        )
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    _repack(1, 2)
+
+
+def downgrade() -> None:
+    _repack(2, 1)
@@ -0,0 +1,126 @@
+"""content addressed bytecode store
+
+Revision ID: dc8164e01eb9
+Revises: c8c5ce442fcc
+Create Date: 2026-10-17 06:32:04.089145
+
+"""
+import hashlib
+import zlib
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'dc8164e01eb9'
+down_revision: Union[str, None] = 'c8c5ce442fcc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_BATCH_SIZE = 1000
+
+contracts = sa.table(
+    "contracts",
+    sa.column("id", sa.Integer),
+    sa.column("bytecode", sa.Text),
+    sa.column("bytecode_hash", sa.String),
+)
+bytecode_blobs = sa.table(
+    "bytecode_blobs",
+    sa.column("hash", sa.String),
+    sa.column("data", sa.LargeBinary),
+    sa.column("size", sa.Integer),
+    sa.column("created_at", sa.DateTime),
+)
+
+
+def _to_bytes(bytecode):
+    # Same normalization as app.features.evm_decoder.to_bytes at the time of this revision
+    bytecode = (bytecode or "").strip()
+    if bytecode.startswith("0x"):
+        bytecode = bytecode[2:]
+    try:
+        return bytes.fromhex(bytecode)
+    except ValueError:
+        return b""
+
+
+def upgrade() -> None:
+    op.create_table('bytecode_blobs',
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('hash')
+    )
+
+    # Backfill: store each distinct bytecode once and point contracts at it by hash
+    conn = op.get_bind()
+    stored = set()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(contracts.c.id, contracts.c.bytecode)
+            .where(contracts.c.id > last_id)
+            .order_by(contracts.c.id)
+            .limit(_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        blobs = []
+        updates = []
+        for contract_id, bytecode in rows:
+            code = _to_bytes(bytecode)
+            digest = hashlib.sha256(code).hexdigest()
+            if digest not in stored:
+                stored.add(digest)
+                blobs.append({
+                    "hash": digest,
+                    "data": zlib.compress(code, 6),
+                    "size": len(code),
+                    "created_at": datetime.utcnow(),
+                })
+            updates.append({"b_id": contract_id, "b_hash": digest})
+        if blobs:
+            conn.execute(bytecode_blobs.insert(), blobs)
+        conn.execute(
+            contracts.update()
+            .where(contracts.c.id == sa.bindparam("b_id"))
+            .values(bytecode_hash=sa.bindparam("b_hash")),
+            updates,
+        )
+        last_id = rows[-1][0]
+
+    with op.batch_alter_table('contracts') as batch_op:
+        batch_op.alter_column('bytecode_hash',
+               existing_type=sa.VARCHAR(length=64),
+               nullable=False)
+        batch_op.create_foreign_key('fk_contracts_bytecode_hash', 'bytecode_blobs', ['bytecode_hash'], ['hash'])
+        batch_op.drop_column('bytecode')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('contracts') as batch_op:
+        batch_op.add_column(sa.Column('bytecode', sa.TEXT(), nullable=True))
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.select(bytecode_blobs.c.hash, bytecode_blobs.c.data)).all()
+    for digest, data in rows:
+        conn.execute(
+            contracts.update()
+            .where(contracts.c.bytecode_hash == digest)
+            .values(bytecode="0x" + zlib.decompress(data).hex())
+        )
+
+    with op.batch_alter_table('contracts') as batch_op:
+        batch_op.alter_column('bytecode',
+               existing_type=sa.TEXT(),
+               nullable=False)
+        batch_op.drop_constraint('fk_contracts_bytecode_hash', type_='foreignkey')
+        batch_op.alter_column('bytecode_hash',
+               existing_type=sa.VARCHAR(length=64),
+               nullable=True)
+    op.drop_table('bytecode_blobs')
@@ -0,0 +1,26 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Settings are read at import time, so the app has to be pointed at a scratch
+# SQLite database before anything from it is imported
+_DATABASE_PATH = Path(tempfile.mkdtemp(prefix="evm-api-tests-")) / "test.db"
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_DATABASE_PATH}"
+os.environ["INFERENCE_WORKERS"] = "0"
+os.environ.pop("METRICS_DIR", None)
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope="session")
+def database_path() -> Path:
+    """The scratch database, migrated to head."""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    command.upgrade(config, "head")
+    return _DATABASE_PATH
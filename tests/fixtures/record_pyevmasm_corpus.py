@@ -0,0 +1,74 @@
+"""Record what pyevmasm makes of a bytecode corpus, for test_evm_decoder.py,
+and the features the pyevmasm-based extractor computed, for test_evm_extractor.py.
+
+pyevmasm is not a dependency of the app any more; install it to re-record::
+
+    pip install pyevmasm
+    python tests/fixtures/record_pyevmasm_corpus.py
+"""
+import json
+import random
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pyevmasm import disassemble_all, disassemble_one
+
+from pyevmasm_extractor import EVMBytecodeFeatureExtractor
+
+_HERE = Path(__file__).resolve().parent
+_ROOT = _HERE.parents[1]
+_EXAMPLES = 10
+
+
+def _corpus():
+    examples = pd.read_excel(_ROOT / "examples.xlsx")["bytecode"][:_EXAMPLES]
+    bytecodes = ["0x" + str(bytecode).strip().removeprefix("0x") for bytecode in examples]
+    rng = random.Random(0)
+    for size in (1, 2, 3, 33, 100, 1000, 2000):
+        for _ in range(3):
+            bytecodes.append("0x" + bytes(rng.randrange(256) for _ in range(size)).hex())
+    # PUSH-heavy code, including a PUSH32 cut off by the end of the code
+    pushes = list(range(0x60, 0x80))
+    for _ in range(5):
+        bytecodes.append("0x" + bytes(rng.choice(pushes + [rng.randrange(256)]) for _ in range(500)).hex())
+    bytecodes += ["0x", "0x00", "0x60", "0x6001", "0x7f" + "ff" * 31, "0x7f" + "ff" * 32, "0xfe5b0c21ef"]
+    return bytecodes
+
+
+def _native(value):
+    # JSON keeps the int/float distinction the extractor test compares by
+    return int(value) if isinstance(value, (int, np.integer)) else float(value)
+
+
+def main():
+    extractor = EVMBytecodeFeatureExtractor(n_workers=1)
+    # Unknown opcodes only exist as decoded instructions (INVALID), not in the table
+    table = [disassemble_one(bytes([opcode]) + bytes(32)) for opcode in range(256)]
+    record = {
+        "opcodes": [
+            {
+                "name": instruction.name,
+                "pops": instruction.pops,
+                "pushes": instruction.pushes,
+                "fee": instruction.fee,
+                "operand_size": instruction.operand_size,
+            }
+            for instruction in table
+        ],
+        "bytecodes": [
+            {
+                "bytecode": bytecode,
+                # The instruction at each pc is the opcode table entry of that byte
+                "pcs": [instruction.pc for instruction in disassemble_all(bytes.fromhex(bytecode[2:]))],
+                "features": [_native(value) for value in extractor._extract_features_single(bytecode).values()],
+            }
+            for bytecode in _corpus()
+        ],
+    }
+    with open(_HERE / "pyevmasm_corpus.json", "w") as handle:
+        json.dump(record, handle, separators=(",", ":"))
+
+
+if __name__ == "__main__":
+    main()
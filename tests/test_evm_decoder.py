@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.features.evm_decoder import (
+    MNEMONICS,
+    OPCODE_FEE,
+    OPCODE_IMMEDIATE,
+    OPCODE_MNEMONIC,
+    OPCODE_POPS,
+    OPCODE_PUSHES,
+    decode,
+    to_bytes,
+)
+
+# Recorded with tests/fixtures/record_pyevmasm_corpus.py
+with open(Path(__file__).parent / "fixtures" / "pyevmasm_corpus.json") as handle:
+    PYEVMASM = json.load(handle)
+
+
+@pytest.mark.parametrize("opcode", range(256))
+def test_opcode_table_matches_pyevmasm(opcode):
+    expected = PYEVMASM["opcodes"][opcode]
+
+    assert MNEMONICS[OPCODE_MNEMONIC[opcode]] == expected["name"]
+    assert OPCODE_POPS[opcode] == expected["pops"]
+    assert OPCODE_PUSHES[opcode] == expected["pushes"]
+    assert OPCODE_FEE[opcode] == expected["fee"]
+    assert OPCODE_IMMEDIATE[opcode] == expected["operand_size"]
+
+
+@pytest.mark.parametrize("case", PYEVMASM["bytecodes"], ids=lambda case: case["bytecode"][:18])
+def test_decode_matches_pyevmasm(case):
+    code = to_bytes(case["bytecode"])
+
+    decoded = decode(code)
+
+    assert decoded.pcs.tolist() == case["pcs"]
+    assert decoded.opcodes.tolist() == list(code[pc] for pc in case["pcs"])
+    assert [MNEMONICS[i] for i in decoded.mnemonic_ids] == [
+        PYEVMASM["opcodes"][code[pc]]["name"] for pc in case["pcs"]
+    ]
+
+
+@pytest.mark.parametrize(
+    "bytecode, expected",
+    [
+        ("0x6001", b"\x60\x01"),
+        ("  6001 ", b"\x60\x01"),
+        ("0x", b""),
+        ("zz", b""),
+        (None, b""),
+        (bytearray(b"\x00"), b"\x00"),
+    ],
+)
+def test_to_bytes(bytecode, expected):
+    assert to_bytes(bytecode) == expected
+
+
+def test_decode_empty():
+    decoded = decode(b"")
+
+    assert decoded.pcs.size == decoded.opcodes.size == decoded.mnemonic_ids.size == 0
+    assert decoded.opcodes.dtype == np.uint8
@@ -0,0 +1,51 @@
+import asyncio
+
+import numpy as np
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.models.bytecode_blob import BytecodeBlob
+from app.models.contract import Contract, ContractMetadata
+from app.services.evm_inference import FEATURE_NAMES, extract_features
+from app.services.feature_store import load_feature_matrix, metadata_values, pack_features, unpack_features
+
+# 24 KB (the contract size limit) of SELFDESTRUCT and one ADD: an odd gas total
+# above 2**24, which float32 cannot hold exactly
+LARGE_CONTRACT = "0x" + "ff" * 24575 + "01"
+
+
+def test_pack_unpack_round_trip_is_exact_for_a_large_contract():
+    features = extract_features(LARGE_CONTRACT)
+    assert features["total_gas_cost"] > 2 ** 24
+    assert float(np.float32(features["total_gas_cost"])) != features["total_gas_cost"]
+
+    restored = unpack_features(pack_features(features))
+
+    assert list(restored) == list(FEATURE_NAMES)
+    assert restored == {name: float(value) for name, value in features.items()}
+
+
+def test_load_feature_matrix_matches_stored_vectors():
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        rows = [extract_features(LARGE_CONTRACT), extract_features("0x6080604052")]
+        async with async_sessionmaker(engine)() as session:
+            for index, features in enumerate(rows):
+                digest = f"{index:064x}"
+                session.add(BytecodeBlob(hash=digest, data=b"", size=0))
+                contract = Contract(bytecode_hash=digest, model_version="m", prediction=0, processing_time_ms=1)
+                contract.metadata_rel = ContractMetadata(**metadata_values(features))
+                session.add(contract)
+            await session.commit()
+            result = await load_feature_matrix(session, chunk_size=1)
+        await engine.dispose()
+        return rows, result
+
+    rows, (contract_ids, matrix) = asyncio.run(run())
+
+    assert contract_ids.tolist() == [1, 2]
+    assert matrix.dtype == np.float64
+    expected = np.array([[features[name] for name in FEATURE_NAMES] for features in rows], dtype=np.float64)
+    np.testing.assert_array_equal(matrix, expected)
@@ -0,0 +1,19 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'{"bytecode": 123}',
+        b'{"bytecode": ["0x6001"]}',
+        b"[]",
+        b'{"bytecode": "0x60',
+    ],
+)
+def test_malformed_json_bodies_are_bad_requests(body):
+    response = TestClient(app).post("/forward", content=body, headers={"Content-Type": "application/json"})
+
+    assert response.status_code == 400
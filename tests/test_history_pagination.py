@@ -0,0 +1,68 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+
+_START = datetime(2026, 1, 1)
+
+
+@pytest.fixture(scope="module")
+def history(database_path):
+    """25 rows over 10 timestamps, so pages have to break ties on id."""
+    connection = sqlite3.connect(database_path)
+    rows = []
+    for index in range(25):
+        timestamp = _START + timedelta(minutes=index % 10)
+        status = "error" if index % 4 == 0 else "success"
+        cursor = connection.execute(
+            "INSERT INTO request_history (created_at, response_status, timestamp) VALUES (?, ?, ?)",
+            # The format SQLAlchemy stores and compares DateTime values in on SQLite
+            (timestamp.isoformat(" ", "microseconds"), status, timestamp.isoformat(" ", "microseconds")),
+        )
+        rows.append((timestamp, cursor.lastrowid, status))
+    connection.commit()
+    connection.close()
+    # Newest first, ties broken by the larger id
+    return sorted(rows, key=lambda row: (row[0], row[1]), reverse=True)
+
+
+def _pages(client, **params):
+    pages = []
+    cursor = None
+    while True:
+        response = client.get("/history", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        pages.append([row["id"] for row in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+def test_cursor_pages_cover_every_row_once_in_order(history):
+    pages = _pages(TestClient(app), limit=10)
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [row_id for page in pages for row_id in page] == [row_id for _, row_id, _ in history]
+
+
+def test_cursor_keeps_filters(history):
+    pages = _pages(TestClient(app), limit=3, status="error")
+
+    assert [row_id for page in pages for row_id in page] == [
+        row_id for _, row_id, status in history if status == "error"
+    ]
+
+
+def test_exact_multiple_of_limit_ends_with_an_empty_page(history):
+    pages = _pages(TestClient(app), limit=5)
+
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 5, 0]
+
+
+def test_invalid_cursor_is_rejected(history):
+    response = TestClient(app).get("/history", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
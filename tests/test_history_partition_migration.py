@@ -0,0 +1,112 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+
+# A scratch PostgreSQL database; the test drops everything in its public schema
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+pytestmark = [
+    pytest.mark.postgres,
+    pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set"),
+]
+
+ROOT = Path(__file__).resolve().parents[1]
+_BEFORE = "d97873efd33e"
+_PARTITIONED = "0187935f045b"
+
+
+def _config() -> Config:
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    return config
+
+
+def _sql(*statements, params=None):
+    """Run the statements in one transaction and return the last one's rows."""
+
+    async def run():
+        engine = create_async_engine(POSTGRES_URL)
+        try:
+            async with engine.begin() as conn:
+                for statement in statements:
+                    result = await conn.execute(text(statement), params or {})
+                return result.all() if result.returns_rows else None
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def _table_kind():
+    return _sql("SELECT relkind::text FROM pg_class WHERE relname = 'request_history'")[0][0]
+
+
+def _partitions():
+    return {
+        name
+        for (name,) in _sql(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'request_history'::regclass"
+        )
+    }
+
+
+def _rows():
+    return _sql("SELECT id, timestamp, response_status FROM request_history ORDER BY id")
+
+
+@pytest.fixture
+def seeded(monkeypatch):
+    """The schema just before partitioning, with history from long ago up to tomorrow."""
+    monkeypatch.setattr(settings, "database_url", POSTGRES_URL)
+    _sql("DROP SCHEMA public CASCADE", "CREATE SCHEMA public")
+    command.upgrade(_config(), _BEFORE)
+    now = datetime.utcnow().replace(microsecond=0)
+    for days_ago in (1000, 400, 30, 1, 0, -1):
+        timestamp = now - timedelta(days=days_ago)
+        _sql(
+            "INSERT INTO request_history (created_at, timestamp, response_status) VALUES (:t, :t, :status)",
+            params={"t": timestamp, "status": f"day {-days_ago}"},
+        )
+    yield _rows()
+    _sql("DROP SCHEMA public CASCADE", "CREATE SCHEMA public")
+
+
+def test_partitioning_round_trips_and_caps_the_backfill(seeded):
+    config = _config()
+    today = datetime.utcnow().date()
+
+    command.upgrade(config, _PARTITIONED)
+    assert _table_kind() == "p"
+    assert _rows() == seeded
+    partitions = _partitions()
+    # 90 past days including today plus 7 ahead, and DEFAULT
+    assert len(partitions) == 90 + 7 + 1
+    assert f"request_history_p{today - timedelta(days=89):%Y%m%d}" in partitions
+    assert f"request_history_p{today + timedelta(days=7):%Y%m%d}" in partitions
+    assert _sql("SELECT response_status FROM request_history_default ORDER BY id") == [
+        ("day -1000",),
+        ("day -400",),
+    ]
+
+    command.downgrade(config, _BEFORE)
+    assert _table_kind() == "r"
+    assert _rows() == seeded
+
+    command.upgrade(config, _PARTITIONED)
+    assert _table_kind() == "p"
+    assert _rows() == seeded
+    # The id sequence carried over, so new rows do not reuse ids
+    (new_id,) = _sql(
+        "INSERT INTO request_history (created_at, timestamp) VALUES (now(), now()) RETURNING id"
+    )[0]
+    assert new_id > max(row_id for row_id, _, _ in seeded)
@@ -0,0 +1,46 @@
+import asyncio
+import threading
+
+import httpx
+
+from app.services import evm_inference
+from app.services.inference_executor import inference_executor
+from app.services.write_behind import write_behind
+from main import app
+
+
+def test_request_beyond_workers_plus_queue_gets_503(database_path, monkeypatch):
+    # workers=0 runs one extraction at a time in a thread, so capacity is 1 + 2
+    monkeypatch.setattr(inference_executor, "queue_size", 2)
+    release = threading.Event()
+    extract_features_timed = evm_inference.extract_features_timed
+
+    def blocked_extraction(bytecode):
+        release.wait(10)
+        return extract_features_timed(bytecode)
+
+    monkeypatch.setattr(evm_inference, "extract_features_timed", blocked_extraction)
+    monkeypatch.setattr(evm_inference, "predict_batch", lambda feature_rows: [0] * len(feature_rows))
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # Distinct bytecodes, so none of them is answered from the cache
+            admitted = [
+                asyncio.create_task(client.post("/forward", json={"bytecode": f"0x60{index:02x}60ff"}))
+                for index in range(inference_executor.capacity)
+            ]
+            while inference_executor.stats()["in_flight"] < inference_executor.capacity:
+                await asyncio.sleep(0.01)
+            rejected = await client.post("/forward", json={"bytecode": "0x6003"})
+            release.set()
+            responses = await asyncio.gather(*admitted)
+        await write_behind.stop()
+        return responses, rejected
+
+    responses, rejected = asyncio.run(run())
+
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == "1"
+    assert rejected.json() == {"detail": "inference queue is full"}
@@ -0,0 +1,73 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.db.session import AsyncSessionLocal
+from app.models.request_rollup import RequestRollup
+from app.services.rollup_service import _empty_rollup, aggregate, apply_rollups
+
+_START = datetime(2027, 3, 1, 12, 0)
+_CONCURRENT_START = datetime(2027, 3, 2, 12, 0)
+
+
+def _rows(count, offset, start=_START):
+    return [
+        {
+            "timestamp": start + timedelta(seconds=17 * (index + offset)),
+            "response_status": "error" if index % 3 == 0 else "success",
+            # Some rows have no timing or size, so both sides of a merge can be NULL
+            "processing_time_ms": None if index % 5 == 0 else (index * 37 + offset) % 3000,
+            "bytecode_length": None if index % 4 == 0 else index * 11 + offset,
+        }
+        for index in range(count)
+    ]
+
+
+async def _apply(batch, hold_s=0.0):
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            await apply_rollups(session, batch)
+            await asyncio.sleep(hold_s)
+
+
+async def _stored(start):
+    async with AsyncSessionLocal() as session:
+        rows = (
+            await session.execute(
+                select(RequestRollup).where(
+                    RequestRollup.bucket_start >= start, RequestRollup.bucket_start < start + timedelta(days=1)
+                )
+            )
+        ).scalars()
+        return {
+            (row.bucket, row.bucket_start, row.response_status): {name: getattr(row, name) for name in _empty_rollup()}
+            for row in rows
+        }
+
+
+def test_batches_into_the_same_buckets_add_up(database_path):
+    batches = [_rows(10, 0), _rows(25, 3), _rows(1, 7)]
+
+    async def run():
+        for batch in batches:
+            await _apply(batch)
+        return await _stored(_START)
+
+    stored = asyncio.run(run())
+
+    assert stored == aggregate([row for batch in batches for row in batch])
+
+
+def test_concurrent_writers_into_a_new_bucket_add_up(database_path):
+    # Each writer holds its transaction open after folding in its rows, as
+    # two workers flushing into the same new minute would
+    batches = [_rows(10, 0, _CONCURRENT_START), _rows(12, 1, _CONCURRENT_START)]
+
+    async def run():
+        await asyncio.gather(*(_apply(batch, hold_s=0.2) for batch in batches))
+        return await _stored(_CONCURRENT_START)
+
+    stored = asyncio.run(run())
+
+    assert stored == aggregate([row for batch in batches for row in batch])
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from app.services.stats_service import DDSketch
+
+QUANTILES = (0.0, 0.01, 0.25, 0.5, 0.9, 0.95, 0.99, 1.0)
+
+
+def _exact(values, q):
+    ordered = sorted(values)
+    return ordered[int(round(q * (len(ordered) - 1)))]
+
+
+@pytest.mark.parametrize("relative_accuracy", [0.01, 0.05])
+def test_quantiles_are_within_relative_accuracy(relative_accuracy):
+    rng = random.Random(0)
+    values = [rng.lognormvariate(3, 2) for _ in range(20000)]
+    sketch = DDSketch(relative_accuracy)
+    for value in values:
+        sketch.add(value)
+
+    for q in QUANTILES:
+        exact = _exact(values, q)
+        assert abs(sketch.quantile(q) - exact) <= relative_accuracy * exact, q
+    assert sketch.count == len(values)
+    assert sketch.mean() == pytest.approx(sum(values) / len(values))
+
+
+def test_zeros_are_counted_exactly():
+    sketch = DDSketch(0.01)
+    for value in [0] * 60 + [5, 10, 20, 40]:
+        sketch.add(value)
+
+    assert sketch.quantile(0.5) == 0
+    assert sketch.quantile(1.0) == 40
+    assert sketch.zero_count == 60
+
+
+def test_merge_matches_a_single_sketch():
+    rng = random.Random(1)
+    values = [rng.expovariate(0.01) for _ in range(5000)]
+    whole, left, right = DDSketch(0.01), DDSketch(0.01), DDSketch(0.01)
+    for index, value in enumerate(values):
+        whole.add(value)
+        (left if index % 3 else right).add(value)
+
+    left.merge(right)
+
+    assert left.bins == whole.bins
+    assert left.count == whole.count
+    assert (left.min, left.max) == (whole.min, whole.max)
+    assert [left.quantile(q) for q in QUANTILES] == [whole.quantile(q) for q in QUANTILES]
+
+
+def test_dict_round_trip():
+    sketch = DDSketch(0.02)
+    for value in (0, 1, 2.5, 1000):
+        sketch.add(value)
+
+    restored = DDSketch.from_dict(sketch.to_dict())
+
+    assert restored.to_dict() == sketch.to_dict()
+    assert [restored.quantile(q) for q in QUANTILES] == [sketch.quantile(q) for q in QUANTILES]
+
+
+def test_empty_sketch():
+    sketch = DDSketch()
+
+    assert sketch.quantile(0.5) is None
+    assert sketch.mean() is None
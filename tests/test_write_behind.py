@@ -0,0 +1,163 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from time import perf_counter
+from types import SimpleNamespace
+
+import pytest
+
+import app.services.write_behind as write_behind_module
+from app.services.write_behind import WriteBehindWriter
+
+
+class _Database:
+    """Stands in for AsyncSessionLocal: keeps committed history rows in memory.
+
+    The first ``failures`` statements raise as a dropped connection would, any
+    statement carrying a row with ``response_status == "bad"`` raises every
+    time, and statements wait for ``gate`` when one is set.
+    """
+
+    def __init__(self, failures=0, gate=None):
+        self.failures = failures
+        self.gate = gate
+        self.committed = []
+
+    def __call__(self):
+        return _Session(self)
+
+
+class _Session:
+    bind = SimpleNamespace(dialect=SimpleNamespace(name="sqlite"))
+
+    def __init__(self, database):
+        self.database = database
+        self.pending = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @asynccontextmanager
+    async def begin(self):
+        yield
+        self.database.committed.extend(self.pending)
+
+    async def execute(self, statement, params=None):
+        if self.database.gate is not None:
+            await self.database.gate.wait()
+        if self.database.failures:
+            self.database.failures -= 1
+            raise ConnectionResetError("connection reset by peer")
+        if isinstance(params, list):
+            if any(row.get("response_status") == "bad" for row in params):
+                raise ValueError("bad row")
+            self.pending.extend(params)
+        # What apply_rollups reads back from its upsert
+        return SimpleNamespace(all=lambda: [])
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = _Database()
+    monkeypatch.setattr(write_behind_module, "AsyncSessionLocal", database)
+    # Keep the app-wide /stats sketches out of it
+    monkeypatch.setattr(write_behind_module.request_stats, "record", lambda *args: None)
+    return database
+
+
+def _history(status="success"):
+    return {
+        "created_at": datetime.utcnow(),
+        "request_headers": None,
+        "response_status": status,
+        "response_data": None,
+        "processing_time_ms": 1,
+        "bytecode_length": 4,
+    }
+
+
+def _writer(**options):
+    return WriteBehindWriter(
+        queue_size=options.pop("queue_size", 100),
+        batch_size=options.pop("batch_size", 100),
+        flush_interval_ms=options.pop("flush_interval_ms", 10),
+        **options,
+    )
+
+
+def test_failed_flush_is_retried_with_backoff(database):
+    database.failures = 2
+    writer = _writer(max_retries=3, retry_backoff_ms=20)
+
+    async def run():
+        for _ in range(3):
+            await writer.add_history(_history())
+        start = perf_counter()
+        await writer.stop()
+        return perf_counter() - start
+
+    elapsed = asyncio.run(run())
+
+    assert len(database.committed) == 3
+    assert writer.retries == 2
+    assert (writer.failed, writer.dropped) == (0, 0)
+    # 20 ms, then 40 ms
+    assert elapsed >= 0.06
+
+
+def test_bad_row_is_dead_lettered_and_its_neighbours_persist(database):
+    writer = _writer(max_retries=1, retry_backoff_ms=1)
+    rows = [_history(), _history("bad"), _history()]
+
+    async def run():
+        for row in rows:
+            await writer.add_history(row)
+        await writer.stop()
+
+    asyncio.run(run())
+
+    assert database.committed == [rows[0], rows[2]]
+    assert writer.failed == 3
+    assert writer.dropped == 1
+    assert [letter["row"] for letter in writer.dead_letters] == [rows[1]]
+    assert writer.dead_letters[0]["error"] == "ValueError: bad row"
+
+
+def test_full_queue_makes_producers_wait(database):
+    database.gate = asyncio.Event()
+    writer = _writer(queue_size=1, batch_size=1)
+
+    async def run():
+        # The flusher takes the first row and blocks on the gate; the second fills the queue
+        await writer.add_history(_history())
+        await asyncio.sleep(0.05)
+        await writer.add_history(_history())
+        blocked = asyncio.create_task(writer.add_history(_history()))
+        await asyncio.sleep(0.05)
+        waiting = not blocked.done()
+        database.gate.set()
+        await blocked
+        await writer.stop()
+        return waiting
+
+    assert asyncio.run(run())
+    assert writer.queue_full_waits == 1
+    assert len(database.committed) == 3
+
+
+def test_stop_drains_the_queue(database):
+    writer = _writer(batch_size=4, flush_interval_ms=50)
+
+    async def run():
+        for _ in range(10):
+            await writer.add_history(_history())
+        await writer.stop()
+
+    asyncio.run(run())
+
+    assert len(database.committed) == 10
+    assert writer.flushed == 10
+    assert writer.flushes == 3